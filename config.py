@@ -5,6 +5,23 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 800
 FPS = 60
 
+# Профили питания: частота кадров при активности и в простое
+# idle_delay - секунд без ввода до перехода в простой
+# static_wait - сколько ждать события, если на экране вообще ничего не меняется
+# wait_for_events - спать в pygame.event.wait вместо активного ожидания
+POWER_PROFILE = "balanced"
+POWER_PROFILES = {
+    "performance": {"fps": FPS, "idle_fps": 30, "idle_delay": 10.0, "static_wait": 0.1, "wait_for_events": False},
+    "balanced": {"fps": FPS, "idle_fps": 15, "idle_delay": 3.0, "static_wait": 0.5, "wait_for_events": True},
+    "battery": {"fps": 30, "idle_fps": 5, "idle_delay": 1.0, "static_wait": 1.0, "wait_for_events": True},
+}
+
+# Режим запущенной игры: пока игра на экране, видеофон на паузе и кадры не рисуются.
+# Выход - по возврату фокуса окну лаунчера или по завершению запущенного процесса
+GAME_MODE_ENABLED = True
+GAME_MODE_WAIT = 1.0             # Интервал проверки процессов в режиме игры (сек)
+GAME_MODE_LAUNCH_TIMEOUT = 15.0  # Игра не забрала фокус за это время - возвращаемся
+
 # Global scale factor
 SCALE_FACTOR = 1.1
 
@@ -83,15 +100,116 @@ SUBCATEGORY_SPACING = get_scaled_value(65)
 SUBCATEGORY_SELECTED_EXTRA_SPACING = get_scaled_value(90)
 OPTION_SPACING = get_scaled_value(65)
 
+# Сколько опций за пределами экрана обрабатывать сверху и снизу
+OPTION_OVERSCAN = 2
+
 # Animation speeds
 ANIMATION_SPEED = 0.2
 FADE_SPEED = 0.1
 PULSE_SPEED = 0.01
 OFFSET_SPEED = 0.2
 
+# Скорости выше заданы на один кадр при этой частоте; при другой частоте
+# анимации пересчитываются по реальному времени и выглядят так же
+ANIMATION_REFERENCE_FPS = 60
+ANIMATION_MAX_FRAME_TIME = 0.1  # Максимальный шаг анимации за кадр (сек)
+
+# Пороги, ниже которых анимация считается завершенной
+ANIMATION_SETTLE_POSITION = 0.5  # пикселей
+ANIMATION_SETTLE_ALPHA = 0.5     # единиц прозрачности
+
 # Interface offset
 INTERFACE_OFFSET_AMOUNT = get_scaled_value(200)
 
+# Каталог кэшей на диске (относительно корня проекта)
+CACHE_DIR = "cache"
+
+# Горячая перезагрузка меню: изменения data/*.json (например, после сканирования Steam)
+# применяются без перезапуска. inotify на Linux, иначе опрос раз в MENU_WATCH_POLL_INTERVAL
+MENU_HOT_RELOAD = True
+MENU_WATCH_POLL_INTERVAL = 2.0
+MENU_RELOAD_DEBOUNCE = 0.5     # Сколько файлы должны простоять без изменений перед перезагрузкой
+
+# Снимок меню (CACHE_DIR/menu_snapshot.bin): объединенные данные JSON и встроенных
+# категорий читаются одним чтением; пересобирается при изменении любого JSON или config.py
+MENU_SNAPSHOT = True
+
+# Хранилище опций в SQLite (data/MENU_STORE_FILE) для библиотек в тысячи игр.
+# Подкатегории, опции которых есть в хранилище, берутся из него (а не из options.json),
+# сортируются по имени и читаются страницами по MENU_STORE_PAGE_SIZE по мере показа -
+# в памяти не больше MENU_STORE_MAX_PAGES страниц на список. Интерфейс только читает
+# хранилище; пишут сканеры и scripts/import_menu_store.py (импорт options.json)
+MENU_STORE = False
+MENU_STORE_FILE = "menu.db"
+MENU_STORE_PAGE_SIZE = 64
+MENU_STORE_MAX_PAGES = 4
+
+# Dirty rect rendering (обновление только изменившихся областей экрана)
+DIRTY_RECT_RENDERING = True
+DIRTY_RECT_MAX_RECTS = 24            # Больше областей - объединяем в одну
+DIRTY_RECT_FULL_UPDATE_RATIO = 0.6   # Доля экрана, после которой делаем полный flip
+
+# Кэш отрисованных надписей (LRU)
+LABEL_CACHE_MAX_ENTRIES = 512
+LABEL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Фоновая загрузка иконок: сразу показывается заглушка, настоящие иконки
+# грузятся пулом потоков (сначала выбранные и видимые) и подставляются между кадрами.
+# 0 потоков - синхронная загрузка при старте, как раньше
+ICON_LOADER_THREADS = 4
+ICON_LOADER_SWAPS_PER_FRAME = 64     # Сколько готовых иконок подставлять за один кадр
+
+# Кэш готовых иконок на диске (CACHE_DIR/icons): при повторном запуске PNG не
+# декодируются и не масштабируются. Сбрасывается при изменении файла, размера или SCALE_FACTOR
+ICON_DISK_CACHE = True
+
+# Кэш вариантов иконок и свечения с разной прозрачностью
+SPRITE_ALPHA_STEPS = 32
+
+# Видеофон: "video" (resources/background.*, нужен OpenCV), "waves" (процедурные
+# волны на NumPy, без видеокодека) или "gradient" (статичный градиент)
+VIDEO_BACKGROUND_MODE = "video"
+
+# Уровни качества видеофона: доля разрешения экрана и частота кадров.
+# Фон лежит под затемнением и текстом меню, поэтому уменьшенные кадры почти незаметны
+VIDEO_QUALITY = "full"
+VIDEO_QUALITY_TIERS = {
+    "full": {"scale": 1.0, "fps": 30},
+    "half": {"scale": 0.5, "fps": 30},
+    "quarter": {"scale": 0.25, "fps": 24},
+}
+
+# Автоматический выбор уровня на лету: если за интервал пропущено больше
+# VIDEO_QUALITY_DROP_RATIO кадров (декодер или рендер не успевают), уровень понижается;
+# после VIDEO_QUALITY_RECOVER_CHECKS интервалов без пропусков - повышается, но не выше VIDEO_QUALITY
+# (если повышенный уровень сразу снова пропускает кадры, ожидание следующего повышения удваивается)
+VIDEO_QUALITY_ADAPTIVE = True
+VIDEO_QUALITY_CHECK_INTERVAL = 5.0
+VIDEO_QUALITY_DROP_RATIO = 0.1
+VIDEO_QUALITY_RECOVER_CHECKS = 6
+
+# Кэш декодированного фонового видео: первый цикл пишется на диск в сыром виде,
+# дальше кадры читаются через mmap. У каждого уровня качества свой кэш; все они
+# сбрасываются при изменении файла или SCALE_FACTOR; видео длиннее лимита всегда
+# декодируется на лету
+VIDEO_FRAME_CACHE = True
+VIDEO_FRAME_CACHE_MAX_BYTES = 768 * 1024 * 1024
+# Процедурные волны: считаются в уменьшенном разрешении и растягиваются при выводе
+WAVE_BACKGROUND_FPS = 30
+WAVE_BACKGROUND_SCALE = 0.25
+WAVE_BACKGROUND_PERIOD = 12.0       # Длина бесшовного цикла (сек)
+WAVE_BACKGROUND_PRECOMPUTE = False  # Хранить цикл в памяти: period * fps кадров уменьшенного размера
+WAVE_BACKGROUND_BASE_COLOR = (10, 30, 80)
+WAVE_BACKGROUND_COLOR = (90, 140, 255)
+WAVE_BACKGROUND_RIBBONS = [  # (центр, амплитуда, частота, оборотов за цикл, толщина, яркость); размеры в долях кадра
+    (0.55, 0.06, 0.8, 1, 0.030, 0.55),
+    (0.58, 0.08, 0.6, 2, 0.060, 0.30),
+    (0.62, 0.05, 1.1, 3, 0.015, 0.70),
+    (0.52, 0.10, 0.5, 1, 0.120, 0.18),
+]
+
+VIDEO_BACKPRESSURE_POLL = 0.002  # Пауза потока видео, пока рендер не показал прошлый кадр (сек)
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -163,6 +281,8 @@ BUILTIN_SUBCATEGORIES = {
 STARTUP_BLACK = 2.0  # seconds for black
 STARTUP_DISPLAY_DURATION = 1.0  # seconds to display logo
 STARTUP_FADE_OUT_DURATION = 3.5  # seconds for fade out
+STARTUP_SKIP_WHEN_LOADED = False  # закончить заставку сразу, как только меню загружено
+STARTUP_ICON_WAIT = 3.0  # сколько заставка ждет иконки сверх своей длины (дальше догрузятся в меню)
 STARTUP_SD_FONT_SIZE = get_scaled_value(120)
 STARTUP_STEAM_DECK_FONT_SIZE = get_scaled_value(40)
 STARTUP_TEXT_RIGHT_MARGIN = get_scaled_value(100)
\ No newline at end of file
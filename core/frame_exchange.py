@@ -0,0 +1,46 @@
+# frame_exchange.py
+import threading
+
+class FrameExchange:
+    """Тройной буфер для передачи кадров из потока декодирования в рендер.
+    Производитель пишет в back, публикует его обменом с ready; рендер забирает
+    ready обменом с front. Каждый слот в любой момент принадлежит одной стороне,
+    поэтому поверхность, которую рисует рендер, никогда не перезаписывается"""
+    
+    def __init__(self, slots):
+        self.slots = slots
+        self.back = 0
+        self.ready = 1
+        self.front = 2
+        self.new_frame = False
+        self.has_frame = False
+        
+        # Обмен индексами - единственная операция под блокировкой, она занимает микросекунды
+        self.lock = threading.Lock()
+    
+    def get_back(self):
+        """Слот, в который производитель пишет следующий кадр"""
+        return self.slots[self.back]
+    
+    def publish(self):
+        """Производитель: кадр в back готов"""
+        with self.lock:
+            self.back, self.ready = self.ready, self.back
+            self.new_frame = True
+    
+    def has_new_frame(self):
+        """Опубликованный кадр еще не забран рендером"""
+        return self.new_frame
+    
+    def acquire(self):
+        """Рендер: (поверхность, новая ли она); (None, False), пока ничего не опубликовано"""
+        with self.lock:
+            if self.new_frame:
+                self.front, self.ready = self.ready, self.front
+                self.new_frame = False
+                self.has_frame = True
+                return self.slots[self.front], True
+        
+        if not self.has_frame:
+            return None, False
+        return self.slots[self.front], False
\ No newline at end of file
@@ -2,16 +2,43 @@
 import pygame
 import os
 import math
+import time
+import threading
+from config import *
+from core.frame_exchange import FrameExchange
 
-try:
-    import cv2
-    import threading
-    import numpy as np
-    HAS_VIDEO = True
-    print("OpenCV loaded successfully")
-except ImportError:
-    HAS_VIDEO = False
-    print("Warning: OpenCV not available, using static background")
+# OpenCV и NumPy импортируются лениво - только когда видеофон найден или включены волны.
+# Сам импорт cv2 занимает сотни миллисекунд и не должен задерживать открытие окна
+cv2 = None
+np = None
+WaveRenderer = None
+VideoFrameCache = None
+
+def _import_numpy():
+    """Импорт NumPy и генератора волн; False если NumPy не установлен"""
+    global np, WaveRenderer
+    if WaveRenderer is None:
+        try:
+            import numpy
+            from core.wave_background import WaveRenderer as wave_renderer_class
+        except ImportError:
+            return False
+        np, WaveRenderer = numpy, wave_renderer_class
+    return True
+
+def _import_opencv():
+    """Импорт OpenCV и кэша кадров; False если OpenCV или NumPy не установлены"""
+    global cv2, np, VideoFrameCache
+    if cv2 is None:
+        try:
+            import cv2 as opencv
+            import numpy
+            from core.video_frame_cache import VideoFrameCache as frame_cache_class
+        except ImportError:
+            return False
+        cv2, np, VideoFrameCache = opencv, numpy, frame_cache_class
+        print("OpenCV loaded successfully")
+    return True
 
 class VideoBackground:
     def __init__(self, screen_width, screen_height):
@@ -19,26 +46,60 @@ class VideoBackground:
         self.screen_height = screen_height
         self.video_surface = None
         self.has_video = False
-        self.current_frame = None
+        self.current_frame = None  # Последний кадр, забранный рендером (только главный поток)
         self.video_thread = None
         self.running = True
+        self.playing = None  # threading.Event: сброшен, пока воспроизведение на паузе
+        
+        # Предвыделенные буферы декодирования и тройной буфер поверхностей для передачи в рендер
+        self.decode_buffer = None
+        self.scaled_buffer = None
+        self.rgb_buffer = None
+        self.exchange = None
+        
+        # Кэш заранее декодированных кадров (None - только живое декодирование)
+        self.frame_cache = None
+        self.cached_frame_index = 0
+        
+        # Темп воспроизведения: кадр выдается по своей временной метке,
+        # следующий не готовится, пока рендер не показал предыдущий
+        self.clock_start = 0.0
+        self.frames_decoded = 0
+        self.frames_displayed = 0
+        self.frames_dropped = 0
+        
+        # Уровень качества: кадры хранятся в уменьшенном размере и растягиваются при выводе
+        self.video_path = None
+        self.quality = None
+        self.pending_quality = None
+        self.pending_quality_record = True
+        self.frame_width = screen_width
+        self.frame_height = screen_height
+        self.frame_step = 1
+        self.upscale_surface = None
+        self.upscaled_frame = None
+        
+        # Процедурные волны (режим "waves")
+        self.wave_renderer = None
+        self.wave_frames = None
+        self.wave_frames_ready = None
+        self.wave_frame_count = 0
         
         # Получаем корневую директорию проекта
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         
-        # Попробуем загрузить видео
-        self.load_video()
+        # Попробуем загрузить видео или запустить волны
+        if VIDEO_BACKGROUND_MODE == "waves":
+            self.load_waves()
+        elif VIDEO_BACKGROUND_MODE == "video":
+            self.load_video()
         
-        # Если видео не загружено, создадим градиентный фон
+        # Если видео не загружено, создадим градиентный фон; для волн он же - заглушка до первого кадра
         if not self.has_video:
             self.create_gradient_background()
     
     def load_video(self):
         """Загрузка видеофайла"""
-        if not HAS_VIDEO:
-            print("OpenCV not installed. Install with: pip install opencv-python")
-            return
-            
         video_paths = [
             os.path.join(self.project_root, "resources", "background.mp4"),
             os.path.join(self.project_root, "background.mp4"),
@@ -47,66 +108,366 @@ class VideoBackground:
             os.path.join(self.project_root, "resources", "background.mov"),
         ]
         
+        # OpenCV нужен, только если видеофайл действительно есть
+        video_paths = [video_path for video_path in video_paths if os.path.exists(video_path)]
+        if video_paths and not _import_opencv():
+            print("Warning: OpenCV not available, using static background. Install with: pip install opencv-python")
+            video_paths = []
+        
         for video_path in video_paths:
-            if os.path.exists(video_path):
-                try:
-                    self.cap = cv2.VideoCapture(video_path)
-                    if not self.cap.isOpened():
-                        continue
-                    
-                    # Получаем параметры видео
-                    self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-                    self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                    
-                    if self.fps <= 0:
-                        self.fps = 30  # Значение по умолчанию
-                    
-                    self.has_video = True
-                    print(f"Loaded video: {video_path} ({self.frame_count} frames, {self.fps} fps)")
-                    
-                    # Запускаем поток для воспроизведения видео
-                    self.video_thread = threading.Thread(target=self._video_loop)
-                    self.video_thread.daemon = True
-                    self.video_thread.start()
-                    break
-                    
-                except Exception as e:
-                    print(f"Error loading video {video_path}: {e}")
+            try:
+                self.cap = cv2.VideoCapture(video_path)
+                if not self.cap.isOpened():
+                    continue
+                
+                # Получаем параметры видео
+                self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+                self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                
+                if self.fps <= 0:
+                    self.fps = 30  # Значение по умолчанию
+                
+                self.video_path = video_path
+                self._apply_quality(VIDEO_QUALITY if VIDEO_QUALITY in VIDEO_QUALITY_TIERS else "full")
+                
+                self.has_video = True
+                print(f"Loaded video: {video_path} ({self.frame_count} frames, {self.fps} fps)")
+                
+                # Запускаем поток для воспроизведения видео
+                self.playing = threading.Event()
+                self.playing.set()
+                self.video_thread = threading.Thread(target=self._video_loop)
+                self.video_thread.daemon = True
+                self.video_thread.start()
+                break
+            
+            except Exception as e:
+                print(f"Error loading video {video_path}: {e}")
         
         if not self.has_video:
             print("No video file found or video playback not supported")
     
+    def set_quality(self, name, record_cache=True):
+        """Смена уровня качества на лету; поток видео применит его перед следующим кадром.
+        record_cache=False - не записывать кэш кадров нового уровня, если его еще нет
+        (при понижении из-за пропусков запись нагрузила бы и так отстающий декодер)"""
+        if name not in VIDEO_QUALITY_TIERS:
+            print(f"Warning: Unknown video quality '{name}'")
+            return
+        self.pending_quality_record = record_cache
+        self.pending_quality = name
+    
+    def _apply_quality(self, name, record_cache=True):
+        """Переход на уровень качества: размер кадров, частота и кэш под новое разрешение"""
+        tier = VIDEO_QUALITY_TIERS[name]
+        self.quality = name
+        self.frame_width = max(1, int(self.screen_width * tier["scale"]))
+        self.frame_height = max(1, int(self.screen_height * tier["scale"]))
+        
+        # Частота уровня ниже частоты видео - показываем каждый N-й кадр
+        self.frame_step = max(1, round(self.fps / tier["fps"]))
+        
+        # Кэш кадров привязан к разрешению
+        if self.frame_cache is not None:
+            self.frame_cache.close()
+            self.frame_cache = None
+        
+        self._allocate_frame_buffers()
+        self._prepare_frame_cache(record_cache)
+        print(f"Video quality: {name} ({self.frame_width}x{self.frame_height}, every {self.frame_step} frame(s))")
+    
+    def _allocate_frame_buffers(self):
+        """Выделение буферов и поверхностей один раз - в цикле воспроизведения память не выделяется"""
+        if self.decode_buffer is None:
+            source_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            source_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            
+            # Кадр декодируется в один и тот же буфер (cap.read переиспользует его)
+            self.decode_buffer = np.empty((source_height, source_width, 3), dtype=np.uint8)
+        
+        # Сначала масштабируем (обычно это уменьшение), потом меняем порядок каналов
+        self.scaled_buffer = np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+        self.rgb_buffer = np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+        
+        self._allocate_frame_exchange()
+    
+    def _allocate_frame_exchange(self):
+        """Тройной буфер поверхностей кадров текущего размера"""
+        # Поверхности сразу в формате экрана, чтобы blit не конвертировал пиксели каждый кадр.
+        # Прежний обмен (при смене качества) просто отбрасывается - рендер держит свой последний кадр
+        self.exchange = FrameExchange([self._create_frame_surface() for _ in range(3)])
+    
+    def _create_frame_surface(self, size=None):
+        """Поверхность кадра в пиксельном формате дисплея"""
+        surface = pygame.Surface(size or (self.frame_width, self.frame_height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+    
+    def _convert_frame(self, frame):
+        """Масштабирование кадра BGR до размера уровня качества и перевод в RGB (в rgb_buffer)"""
+        if frame.shape[:2] == self.scaled_buffer.shape[:2]:
+            scaled = frame
+        else:
+            # INTER_AREA при уменьшении дает меньше ряби, чем билинейная интерполяция
+            scaled = cv2.resize(frame, (self.frame_width, self.frame_height), dst=self.scaled_buffer, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+    
+    def _upload_rgb(self, rgb):
+        """Перенос RGB кадра в свободную поверхность тройного буфера без промежуточных копий"""
+        # surfarray ожидает оси (x, y) - swapaxes дает представление без копирования
+        surface = self.exchange.get_back()
+        pygame.surfarray.blit_array(surface, rgb.swapaxes(0, 1))
+        return surface
+    
+    def _ensure_capture(self):
+        """Открытие декодера заново, если он был освобожден при игре из кэша"""
+        if not self.cap.isOpened():
+            self.cap = cv2.VideoCapture(self.video_path)
+    
+    def _prepare_frame_cache(self, record=True):
+        """Готовый кэш кадров - играем из него; иначе первый цикл видео записывается в кэш
+        (если record)"""
+        if not VIDEO_FRAME_CACHE:
+            self._ensure_capture()
+            return
+        
+        cache_dir = os.path.join(self.project_root, CACHE_DIR, "video")
+        try:
+            frame_cache = VideoFrameCache(self.video_path, self.frame_width, self.frame_height, cache_dir, VIDEO_FRAME_CACHE_MAX_BYTES)
+        except OSError as e:
+            print(f"Warning: Video frame cache disabled: {e}")
+            self._ensure_capture()
+            return
+        
+        if frame_cache.fits(self.frame_count) and frame_cache.open():
+            print(f"Playing background from frame cache ({frame_cache.frame_count} frames)")
+            self.frame_cache = frame_cache
+            # Кодек больше не нужен
+            self.cap.release()
+            return
+        
+        self._ensure_capture()
+        if not frame_cache.fits(self.frame_count):
+            print(f"Video is too long for the frame cache ({self.frame_count} frames), decoding live")
+        elif not record:
+            print("No frame cache for this quality yet, decoding live")
+        elif frame_cache.start_recording():
+            # Записываем цикл с самого начала
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.frame_cache = frame_cache
+    
+    def _is_recording(self):
+        """Идет ли запись первого цикла в кэш"""
+        return self.frame_cache is not None and self.frame_cache.writer is not None
+    
+    def _upload_cached_frame(self):
+        """Следующий кадр из кэша: mmap -> поверхность кольца, без декодирования"""
+        frame = self.frame_cache.frame(self.cached_frame_index)
+        self.cached_frame_index = (self.cached_frame_index + 1) % self.frame_cache.frame_count
+        return self._upload_rgb(frame)
+    
+    def _read_frame(self):
+        """Чтение следующего кадра из декодера; None если цикл видео закончился"""
+        ret, frame = self.cap.read(self.decode_buffer)
+        if not ret:
+            # Первый цикл полностью записан - дальше играем из кэша
+            if self._is_recording():
+                if self.frame_cache.finish_recording(self.fps):
+                    self.cached_frame_index = 0
+                    self.cap.release()
+                    return None
+                self.frame_cache = None
+            
+            # Если видео закончилось, перематываем в начало
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return None
+        
+        # Некоторые кодеки отдают кадр другого размера - переходим на него
+        if frame.shape != self.decode_buffer.shape:
+            self.decode_buffer = frame
+        return frame
+    
+    def _record_frame(self):
+        """Дописывание подготовленного кадра (rgb_buffer) в кэш во время первого цикла"""
+        if not self.frame_cache.record(self.rgb_buffer):
+            self.frame_cache = None
+    
+    def _decode_frame(self):
+        """Декодирование следующего кадра в поверхность; None если цикл видео закончился"""
+        frame = self._read_frame()
+        if frame is None:
+            return None
+        
+        self._convert_frame(frame)
+        if self._is_recording():
+            self._record_frame()
+        return self._upload_rgb(self.rgb_buffer)
+    
+    def _skip_frames(self, count):
+        """Пропуск кадров без вывода на экран; возвращает число пропущенных"""
+        if self.frame_cache is not None and self.frame_cache.is_open():
+            self.cached_frame_index = (self.cached_frame_index + count) % self.frame_cache.frame_count
+            return count
+        
+        skipped = 0
+        for _ in range(count):
+            if self._is_recording():
+                # Во время записи кэша нужен каждый кадр - конвертируем, но не выводим
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                self._convert_frame(frame)
+                self._record_frame()
+            elif not self.cap.grab():
+                # grab() только продвигает поток, кадр не извлекается
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                break
+            skipped += 1
+        return skipped
+    
+    def _wait_frame_slot(self, next_frame, frame_duration):
+        """Пауза, ожидание показа прошлого кадра и временной метки кадра next_frame.
+        Возвращает отставание в целых кадрах или None, если кадр пока готовить не нужно"""
+        # Пауза (например, запущена игра): поток спит без опроса до resume()
+        if not self.playing.is_set():
+            self.playing.wait()
+            return None
+        
+        # Рендер еще не забрал прошлый кадр - впрок не готовим
+        if self.exchange.has_new_frame():
+            time.sleep(VIDEO_BACKPRESSURE_POLL)
+            return None
+        
+        now = time.monotonic()
+        presentation_time = self.clock_start + next_frame * frame_duration
+        if now < presentation_time:
+            # Спим до метки кадра короткими отрезками, чтобы быстро реагировать на stop()
+            time.sleep(min(presentation_time - now, 0.05))
+            return None
+        
+        # Опаздываем на целые кадры; больше секунды отставания не догоняем
+        behind = int((now - presentation_time) / frame_duration)
+        if behind > max(1, int(1.0 / frame_duration)):
+            # Долгая пауза (например, рендер стоял) - просто продолжаем с текущего места
+            self.clock_start = now - next_frame * frame_duration
+            return 0
+        return behind
+    
+    def _publish_frame(self):
+        """Публикация кадра, записанного в back; рендер заберет его в draw()"""
+        self.frames_decoded += 1
+        self.exchange.publish()
+    
     def _video_loop(self):
-        """Цикл воспроизведения видео в отдельном потоке"""
+        """Цикл воспроизведения видео в отдельном потоке.
+        Кадры выдаются по временным меткам от монотонных часов, без накопления дрейфа"""
         try:
-            while self.running and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    # Если видео закончилось, перематываем в начало
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    continue
-                
-                # Конвертируем BGR в RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame_duration = 1.0 / self.fps
+            self.clock_start = time.monotonic()
+            next_frame = 0  # Номер следующего кадра на временной шкале
+            position = 0    # Номер кадра, на котором стоит декодер (или кэш)
+            
+            while self.running:
+                # Смена уровня качества без перезапуска потока
+                if self.pending_quality is not None:
+                    self._apply_quality(self.pending_quality, self.pending_quality_record)
+                    self.pending_quality = None
                 
-                # Масштабируем под размер экрана
-                frame_resized = cv2.resize(frame_rgb, (self.screen_width, self.screen_height))
+                # Отставшие кадры пропускаем
+                behind = self._wait_frame_slot(next_frame, frame_duration)
+                if behind is None:
+                    continue
+                target = next_frame + behind
                 
-                # Конвертируем в поверхность pygame
-                frame_surface = pygame.image.frombuffer(frame_resized.tobytes(), frame_resized.shape[1::-1], "RGB")
-                self.current_frame = frame_surface
+                # Кадры между текущим и нужным (отставание и прореживание уровня) не выводятся
+                if target > position:
+                    skipped = self._skip_frames(target - position)
+                    self.frames_dropped += min(behind, skipped)
                 
-                # Задержка для синхронизации с FPS видео
-                if hasattr(self, 'fps') and self.fps > 0:
-                    pygame.time.wait(int(1000 / self.fps))
+                if self.frame_cache is not None and self.frame_cache.is_open():
+                    frame_surface = self._upload_cached_frame()
+                elif self.cap.isOpened():
+                    frame_surface = self._decode_frame()
+                    if frame_surface is None:
+                        position = target
+                        continue
                 else:
-                    pygame.time.wait(33)  # 30 FPS по умолчанию
+                    break
+                
+                position = target + 1
+                next_frame = target + self.frame_step
+                self._publish_frame()
                     
         except Exception as e:
             print(f"Video playback error: {e}")
         finally:
             if hasattr(self, 'cap'):
                 self.cap.release()
+            if self.frame_cache is not None:
+                self.frame_cache.close()
+    
+    def load_waves(self):
+        """Запуск процедурного фона из волн - анимация без видеокодека и OpenCV"""
+        if not _import_numpy():
+            print("NumPy not installed, using static background")
+            return
+        
+        self.fps = WAVE_BACKGROUND_FPS
+        self.frame_width = max(1, int(self.screen_width * WAVE_BACKGROUND_SCALE))
+        self.frame_height = max(1, int(self.screen_height * WAVE_BACKGROUND_SCALE))
+        self.wave_renderer = WaveRenderer(self.frame_width, self.frame_height, WAVE_BACKGROUND_PERIOD)
+        self.wave_frame_count = max(1, round(WAVE_BACKGROUND_PERIOD * self.fps))
+        self._allocate_frame_exchange()
+        
+        # Бесшовный цикл можно запомнить целиком: кадры заполняются по мере первого показа
+        if WAVE_BACKGROUND_PRECOMPUTE:
+            self.wave_frames = np.empty((self.wave_frame_count, self.frame_height, self.frame_width, 3), dtype=np.uint8)
+            self.wave_frames_ready = np.zeros(self.wave_frame_count, dtype=bool)
+        
+        self.quality = "waves"
+        print(f"Procedural wave background: {self.frame_width}x{self.frame_height}, {self.fps} fps")
+        
+        self.playing = threading.Event()
+        self.playing.set()
+        self.video_thread = threading.Thread(target=self._wave_loop)
+        self.video_thread.daemon = True
+        self.video_thread.start()
+    
+    def _render_wave_frame(self, index):
+        """Кадр волн с номером index на бесшовном цикле"""
+        index %= self.wave_frame_count
+        if self.wave_frames is not None and self.wave_frames_ready[index]:
+            return self.wave_frames[index]
+        
+        rgb = self.wave_renderer.render(index * WAVE_BACKGROUND_PERIOD / self.wave_frame_count)
+        if self.wave_frames is not None:
+            self.wave_frames[index] = rgb
+            self.wave_frames_ready[index] = True
+        return rgb
+    
+    def _wave_loop(self):
+        """Генерация кадров волн в отдельном потоке с тем же темпом, что и у видео"""
+        try:
+            frame_duration = 1.0 / self.fps
+            self.clock_start = time.monotonic()
+            next_frame = 0
+            
+            while self.running:
+                behind = self._wait_frame_slot(next_frame, frame_duration)
+                if behind is None:
+                    continue
+                
+                # Кадр зависит только от номера - при отставании сразу считаем нужный
+                self.frames_dropped += behind
+                next_frame += behind
+                
+                self._upload_rgb(self._render_wave_frame(next_frame))
+                self._publish_frame()
+                next_frame += 1
+        
+        except Exception as e:
+            print(f"Wave background error: {e}")
     
     def create_gradient_background(self):
         """Создание градиентного фона если видео недоступно"""
@@ -133,17 +494,83 @@ class VideoBackground:
         """Обновление видеофона"""
         pass  # Обновление происходит в отдельном потоке
     
-    def draw(self, screen):
-        """Отрисовка фона"""
-        if self.has_video and self.current_frame is not None:
-            # Рисуем текущий кадр видео
-            screen.blit(self.current_frame, (0, 0))
+    def is_animating(self):
+        """Меняется ли фон от кадра к кадру"""
+        return self.exchange is not None
+    
+    def has_new_frame(self):
+        """Есть ли кадр, который рендер еще не показывал"""
+        return self.exchange is not None and self.exchange.has_new_frame()
+    
+    def draw(self, screen, areas=None):
+        """Отрисовка фона. Если кадр не сменился и переданы areas, фон восстанавливается
+        только в этих областях (остальной экран уже содержит этот же кадр).
+        Возвращает True, если нарисован новый кадр"""
+        is_new = False
+        if self.exchange is not None:
+            frame, is_new = self.exchange.acquire()
+            if is_new:
+                self.current_frame = frame
+                self.frames_displayed += 1
+        
+        if self.current_frame is not None:
+            # Текущий кадр видео (или волн)
+            source = self._get_display_frame(is_new)
         else:
-            # Рисуем градиентный фон
-            screen.blit(self.background, (0, 0))
+            # Градиентный фон
+            source = self.background
+        
+        if is_new or areas is None:
+            screen.blit(source, (0, 0))
+        else:
+            for rect in areas:
+                screen.blit(source, rect, rect)
+        return is_new
+    
+    def _get_display_frame(self, is_new):
+        """Кадр в размере экрана; уменьшенные кадры растягиваются один раз на каждый новый кадр"""
+        frame = self.current_frame
+        if frame.get_size() == (self.screen_width, self.screen_height):
+            return frame
+        
+        if self.upscale_surface is None:
+            self.upscale_surface = self._create_frame_surface((self.screen_width, self.screen_height))
+        if is_new or self.upscaled_frame is not frame:
+            pygame.transform.scale(frame, (self.screen_width, self.screen_height), self.upscale_surface)
+            self.upscaled_frame = frame
+        return self.upscale_surface
+    
+    def get_stats(self):
+        """Счетчики воспроизведения: подготовлено, показано и пропущено кадров"""
+        return {
+            "decoded": self.frames_decoded,
+            "displayed": self.frames_displayed,
+            "dropped": self.frames_dropped,
+            "quality": self.quality,
+            "source": self._get_frame_source(),
+        }
+    
+    def _get_frame_source(self):
+        """Откуда берутся кадры фона"""
+        if self.wave_renderer is not None:
+            return "waves"
+        if not self.has_video:
+            return "gradient"
+        return "cache" if self.frame_cache is not None and self.frame_cache.is_open() else "decode"
+    
+    def pause(self):
+        """Приостановка декодирования (кадр на экране остается прежним)"""
+        if self.playing is not None:
+            self.playing.clear()
+    
+    def resume(self):
+        """Продолжение воспроизведения после паузы"""
+        if self.playing is not None:
+            self.playing.set()
     
     def stop(self):
         """Остановка видео"""
         self.running = False
+        self.resume()
         if hasattr(self, 'cap'):
             self.cap.release()
\ No newline at end of file
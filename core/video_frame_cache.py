@@ -0,0 +1,163 @@
+# video_frame_cache.py
+import os
+import json
+import mmap
+import hashlib
+import numpy as np
+from config import *
+
+class VideoFrameCache:
+    """Кэш заранее декодированных кадров фонового видео: сырые RGB кадры
+    в разрешении экрана, воспроизведение через mmap без работы кодека"""
+    
+    def __init__(self, video_path, width, height, cache_dir, max_bytes):
+        self.video_path = os.path.abspath(video_path)
+        self.width = width
+        self.height = height
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.frame_bytes = width * height * 3
+        
+        # Ключ кэша: источник (путь, время изменения, размер файла и масштаб интерфейса)
+        # и разрешение. У каждого уровня качества свой кэш с общим ключом источника
+        stat = os.stat(self.video_path)
+        source = f"{self.video_path}|{stat.st_mtime_ns}|{stat.st_size}|{SCALE_FACTOR}"
+        self.source_key = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+        
+        base_name = os.path.splitext(os.path.basename(self.video_path))[0]
+        self.prefix = f"{base_name}_"
+        base = os.path.join(cache_dir, f"{self.prefix}{self.source_key}_{width}x{height}")
+        self.raw_path = base + ".raw"
+        self.meta_path = base + ".json"
+        self.tmp_path = base + ".tmp"
+        
+        # Воспроизведение
+        self.file = None
+        self.mmap = None
+        self.frame_count = 0
+        
+        # Запись
+        self.writer = None
+        self.recorded_frames = 0
+    
+    def fits(self, frame_count):
+        """Помещается ли цикл видео в лимит кэша"""
+        return 0 < frame_count * self.frame_bytes <= self.max_bytes
+    
+    def open(self):
+        """Открытие готового кэша; True если кадры можно читать"""
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["width"] != self.width or meta["height"] != self.height:
+                return False
+            
+            frame_count = int(meta["frames"])
+            if frame_count <= 0 or os.path.getsize(self.raw_path) != frame_count * self.frame_bytes:
+                return False
+            
+            self.file = open(self.raw_path, "rb")
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.frame_count = frame_count
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Warning: Video frame cache is unusable, decoding live: {e}")
+            self.close()
+            return False
+    
+    def start_recording(self):
+        """Начало записи кадров во временный файл"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.writer = open(self.tmp_path, "wb")
+            self.recorded_frames = 0
+            return True
+        except OSError as e:
+            print(f"Warning: Cannot create video frame cache: {e}")
+            self.writer = None
+            return False
+    
+    def record(self, rgb_frame):
+        """Запись очередного кадра (RGB, разрешение экрана); False если запись прервана"""
+        if (self.recorded_frames + 1) * self.frame_bytes > self.max_bytes:
+            # Количество кадров в контейнере было занижено - в лимит не укладываемся
+            print("Video frame cache limit exceeded, staying on live decode")
+            self.abort_recording()
+            return False
+        
+        try:
+            self.writer.write(rgb_frame.data)
+            self.recorded_frames += 1
+            return True
+        except OSError as e:
+            print(f"Warning: Video frame cache write failed: {e}")
+            self.abort_recording()
+            return False
+    
+    def finish_recording(self, fps):
+        """Завершение записи полного цикла; True если кэш готов к воспроизведению"""
+        if self.writer is None:
+            return False
+        
+        try:
+            self.writer.close()
+            self.writer = None
+            if self.recorded_frames == 0:
+                os.remove(self.tmp_path)
+                return False
+            
+            # Метаданные пишутся последними: без них недописанный кэш не откроется
+            os.replace(self.tmp_path, self.raw_path)
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"width": self.width, "height": self.height, "frames": self.recorded_frames, "fps": fps}, f)
+        except OSError as e:
+            print(f"Warning: Cannot finalize video frame cache: {e}")
+            self.abort_recording()
+            return False
+        
+        self._remove_stale_entries()
+        print(f"Video frame cache ready: {self.recorded_frames} frames, {self.recorded_frames * self.frame_bytes // (1024 * 1024)} MB")
+        return self.open()
+    
+    def abort_recording(self):
+        """Отмена записи и удаление временного файла"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+    
+    def _remove_stale_entries(self):
+        """Удаление кэшей этого видео с устаревшим источником; кэши других уровней
+        качества того же источника остаются - смена уровня не декодирует видео заново"""
+        current = f"{self.prefix}{self.source_key}_"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(self.prefix) and not name.startswith(current) and name.endswith((".raw", ".json", ".tmp")):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+    
+    def frame(self, index):
+        """Кадр из mmap как массив (высота, ширина, 3) - представление без копирования"""
+        offset = (index % self.frame_count) * self.frame_bytes
+        return np.frombuffer(self.mmap, dtype=np.uint8, count=self.frame_bytes, offset=offset).reshape(self.height, self.width, 3)
+    
+    def is_open(self):
+        """Готов ли кэш к воспроизведению"""
+        return self.mmap is not None
+    
+    def close(self):
+        """Освобождение mmap и файлов"""
+        if self.writer is not None:
+            self.abort_recording()
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.frame_count = 0
\ No newline at end of file
@@ -0,0 +1,61 @@
+# wave_background.py
+import math
+import numpy as np
+from config import *
+
+class WaveRenderer:
+    """Процедурный фон в стиле XMB: полупрозрачные волны поверх градиента.
+    Считается векторно в NumPy в уменьшенном разрешении, все буферы выделяются один раз"""
+    
+    def __init__(self, width, height, period):
+        self.width = width
+        self.height = height
+        self.period = period
+        
+        # Координаты в долях кадра: столбец y и строка x
+        self.y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+        self.x = np.linspace(0.0, 1.0, width, dtype=np.float32)
+        
+        # Вертикальный градиент основы - тот же, что у статического фона
+        ratio = 1.0 - self.y
+        self.base = np.empty((height, 1, 3), dtype=np.float32)
+        for channel, value in enumerate(WAVE_BACKGROUND_BASE_COLOR):
+            self.base[:, :, channel] = value * ratio
+        self.color = np.array(WAVE_BACKGROUND_COLOR, dtype=np.float32)
+        
+        # Рабочие буферы кадра
+        self.curve = np.empty(width, dtype=np.float32)
+        self.distance = np.empty((height, width), dtype=np.float32)
+        self.intensity = np.empty((height, width), dtype=np.float32)
+        self.pixels = np.empty((height, width, 3), dtype=np.float32)
+        self.rgb = np.empty((height, width, 3), dtype=np.uint8)
+    
+    def render(self, t):
+        """Кадр в момент t (сек) как массив RGB (высота, ширина, 3); буфер переиспользуется.
+        Все фазы делают целое число оборотов за period, поэтому анимация бесшовно зацикливается"""
+        angle = 2.0 * math.pi * (t % self.period) / self.period
+        self.intensity.fill(0.0)
+        
+        for center, amplitude, frequency, turns, thickness, strength in WAVE_BACKGROUND_RIBBONS:
+            # Линия ленты: бегущая синусоида плюс медленное покачивание всей ленты по вертикали
+            np.multiply(self.x, 2.0 * math.pi * frequency, out=self.curve)
+            self.curve += angle * turns
+            np.sin(self.curve, out=self.curve)
+            self.curve *= amplitude
+            self.curve += center + 0.5 * amplitude * math.sin(angle * (turns + 1) + center * 7.0)
+            
+            # Яркость спадает по гауссиане от линии ленты
+            np.subtract(self.y, self.curve, out=self.distance)
+            self.distance *= 1.0 / thickness
+            np.square(self.distance, out=self.distance)
+            np.negative(self.distance, out=self.distance)
+            np.exp(self.distance, out=self.distance)
+            self.distance *= strength
+            self.intensity += self.distance
+        
+        # Основа + цвет лент, с насыщением в 255
+        np.multiply(self.intensity[:, :, None], self.color, out=self.pixels)
+        self.pixels += self.base
+        np.clip(self.pixels, 0.0, 255.0, out=self.pixels)
+        self.rgb[...] = self.pixels
+        return self.rgb
\ No newline at end of file
@@ -1,12 +1,34 @@
 # xmb_animations.py
+import math
 from config import *
+from core.xmb_layout import XMBLayout
+from core.xmb_scheduler import AnimationScheduler
 
 class XMBAnimations:
     def __init__(self, xmb_interface):
         self.xmb = xmb_interface
+        self.layout = XMBLayout()
+        
+        # Планировщик: обновляются только элементы, которые еще движутся
+        self.scheduler = AnimationScheduler(self.xmb.animation_manager)
+        
+        # Последние состояния, для которых выставлялись цели
+        self.category_state = None
+        self.subcategory_state = None
+        self.option_state = None
+        self.fade_state = None
+        
+        # Окно видимых опций: анимируются и рисуются только они
+        self.option_window = (0, 0)
+        self.option_window_key = None
     
     def update_category_positions(self):
         """Обновление целевых позиций категорий для анимации"""
+        state = (self.xmb.current_category_index, self.xmb.selection_x, self.xmb.interface_offset, len(self.xmb.categories))
+        if state == self.category_state:
+            return
+        self.category_state = state
+        
         for i, category in enumerate(self.xmb.categories):
             # Вычисляем смещение относительно выбранной категории
             offset = (i - self.xmb.current_category_index) * CATEGORY_SPACING
@@ -15,9 +37,7 @@ class XMBAnimations:
             category.target_x = self.xmb.selection_x + offset - self.xmb.interface_offset
             
             # Плавная анимация движения
-            category.current_x = self.xmb.animation_manager.lerp_position(
-                category.current_x, category.target_x
-            )
+            self.scheduler.animate(category, "current_x", category.target_x, "position", "categories")
     
     def update_subcategory_positions(self, initial=False):
         """Обновление целевых позиций подкатегорий для вертикальной анимации"""
@@ -25,115 +45,152 @@ class XMBAnimations:
         if current_category.subcategories:
             subcategories = self.xmb.subcategory_objects.get(current_category.name, [])
             
+            state = (current_category.name, len(subcategories), self.xmb.current_subcategory_index, self.xmb.subcategory_selection_y)
+            if state == self.subcategory_state and not initial:
+                return
+            self.subcategory_state = state
+            
+            # Целевые позиции считаются заново только при смене выбора или списка
+            targets = self.layout.get_subcategory_targets(
+                current_category.name, len(subcategories),
+                self.xmb.current_subcategory_index, self.xmb.subcategory_selection_y
+            )
+            
             for i, subcategory_obj in enumerate(subcategories):
-                # Базовое расстояние между подкатегориями
-                base_spacing = SUBCATEGORY_SPACING
-                
-                # Увеличиваем расстояние между выбранной подкатегорией и предыдущей
-                spacing = base_spacing + SUBCATEGORY_SELECTED_EXTRA_SPACING
-                
-                # Вычисляем смещение относительно выбранной подкатегории
-                offset = 0
-                for j in range(i, self.xmb.current_subcategory_index):
-                    if j == self.xmb.current_subcategory_index - 1:
-                        offset += spacing
-                    else:
-                        offset += base_spacing
-                
-                # Корректируем направление смещения
-                if i < self.xmb.current_subcategory_index:
-                    offset = -offset
-                elif i > self.xmb.current_subcategory_index:
-                    offset = 0
-                    for j in range(self.xmb.current_subcategory_index, i):
-                        if j == self.xmb.current_subcategory_index:
-                            offset += base_spacing
-                        else:
-                            offset += base_spacing
-                
-                subcategory_obj.target_y = self.xmb.subcategory_selection_y + offset
+                subcategory_obj.target_y = targets[i]
                 
                 # Если это первая инициализация, сразу устанавливаем позицию
                 if initial or not subcategory_obj.initialized:
-                    subcategory_obj.current_y = subcategory_obj.target_y
+                    self.scheduler.snap(subcategory_obj, "current_y", subcategory_obj.target_y, "subcategories")
                     subcategory_obj.initialized = True
                 else:
                     # Плавная анимация движения
-                    subcategory_obj.current_y = self.xmb.animation_manager.lerp_position(
-                        subcategory_obj.current_y, subcategory_obj.target_y
-                    )
+                    self.scheduler.animate(subcategory_obj, "current_y", subcategory_obj.target_y, "position", "subcategories")
     
     def update_option_positions(self, initial=False):
-        """Обновление целевых позиций опций для вертикальной анимации"""
+        """Обновление целевых позиций опций для вертикальной анимации.
+        Обрабатываются только опции в видимой полосе экрана (плюс запас)"""
         if self.xmb.navigation_level == 2 and self.xmb.categories[self.xmb.current_category_index].subcategories:
             subcategory_name = self.xmb.categories[self.xmb.current_category_index].subcategories[self.xmb.current_subcategory_index]
             current_options = self.xmb.option_objects.get(subcategory_name, [])
+            option_count = len(current_options)
             
-            for i, option_obj in enumerate(current_options):
-                base_spacing = OPTION_SPACING
-                spacing = base_spacing
-                
-                # Вычисляем смещение относительно выбранной опции
-                offset = 0
-                for j in range(i, self.xmb.current_option_index):
-                    offset += base_spacing
-                
-                # Корректируем направление смещения
-                if i < self.xmb.current_option_index:
-                    offset = -offset
-                elif i > self.xmb.current_option_index:
-                    offset = 0
-                    for j in range(self.xmb.current_option_index, i):
-                        offset += base_spacing
-                
-                option_obj.target_y = OPTION_SELECTION_Y + offset
+            # Список стоит на месте - окно и цели не меняются
+            state = (subcategory_name, option_count, self.xmb.current_option_index)
+            if state == self.option_state and not initial and self.scheduler.is_settled("options"):
+                return
+            self.option_state = state
+            
+            # Окно прошлого кадра относится к этому же списку?
+            previous_first, previous_last = self.option_window
+            if self.option_window_key != subcategory_name:
+                self._release_option_window()
+                previous_first, previous_last = 0, 0
+            previous_last = min(previous_last, option_count)
+            
+            # Все опции окна движутся одинаково, поэтому отставание любой из них
+            # от новой цели общее для всего списка
+            lag = 0
+            if not initial and previous_first < previous_last:
+                reference = current_options[previous_first]
+                if reference.initialized:
+                    lag = reference.current_y - (
+                        OPTION_SELECTION_Y + self.layout.option_offset(previous_first, self.xmb.current_option_index)
+                    )
+            
+            first, last = self._get_visible_option_range(option_count, lag)
+            
+            # Опции, ушедшие из окна, при возвращении будут выставлены заново
+            for i in range(previous_first, previous_last):
+                if i < first or i >= last:
+                    current_options[i].initialized = False
+                    self.scheduler.cancel(current_options[i], "current_y", "options")
+            
+            targets = self.layout.get_option_targets(subcategory_name, self.xmb.current_option_index, first, last)
+            for i in range(first, last):
+                option_obj = current_options[i]
+                option_obj.target_y = targets[i - first]
                 
                 # Если это первая инициализация, сразу устанавливаем позицию
-                if initial or not option_obj.initialized:
-                    option_obj.current_y = option_obj.target_y
+                if initial:
+                    self.scheduler.snap(option_obj, "current_y", option_obj.target_y, "options")
+                    option_obj.initialized = True
+                elif not option_obj.initialized:
+                    # Опция вошла в окно - ставим ее туда, где она была бы вместе со списком
+                    option_obj.current_y = option_obj.target_y + lag
                     option_obj.initialized = True
+                    self.scheduler.animate(option_obj, "current_y", option_obj.target_y, "position", "options")
                 else:
                     # Плавная анимация движения
-                    option_obj.current_y = self.xmb.animation_manager.lerp_position(
-                        option_obj.current_y, option_obj.target_y
-                    )
+                    self.scheduler.animate(option_obj, "current_y", option_obj.target_y, "position", "options")
+            
+            self.option_window = (first, last)
+            self.option_window_key = subcategory_name
+    
+    def _get_visible_option_range(self, option_count, lag=0):
+        """Диапазон индексов опций, попадающих в видимую полосу экрана"""
+        # Полоса экрана с запасом в одну строку сверху и снизу
+        top = -OPTION_SPACING - OPTION_SELECTION_Y - lag
+        bottom = SCREEN_HEIGHT + OPTION_SPACING - OPTION_SELECTION_Y - lag
+        
+        first = self.xmb.current_option_index + math.floor(top / OPTION_SPACING) - OPTION_OVERSCAN
+        last = self.xmb.current_option_index + math.ceil(bottom / OPTION_SPACING) + OPTION_OVERSCAN + 1
+        return max(0, first), max(0, min(option_count, last))
+    
+    def _release_option_window(self):
+        """Сброс окна опций предыдущего списка"""
+        first, last = self.option_window
+        previous_options = self.xmb.option_objects.get(self.option_window_key, [])
+        for i in range(first, min(last, len(previous_options))):
+            previous_options[i].initialized = False
+            self.scheduler.cancel(previous_options[i], "current_y", "options")
+        self.option_window = (0, 0)
+        self.option_window_key = None
+    
+    def get_option_window(self):
+        """Текущее окно видимых опций (first, last)"""
+        return self.option_window
     
     def update_fade_animation(self):
         """Обновление анимации плавного появления/исчезания подкатегорий"""
         current_category = self.xmb.categories[self.xmb.current_category_index]
         previous_category = self.xmb.categories[self.xmb.previous_category_index]
         
+        state = (current_category.name, previous_category.name, len(self.xmb.subcategory_objects.get(current_category.name, [])))
+        if state == self.fade_state:
+            return
+        self.fade_state = state
+        
         # Если сменили категорию
         if self.xmb.current_category_index != self.xmb.previous_category_index:
             # Старые подкатегории исчезают
             if previous_category.subcategories:
                 old_subcategories = self.xmb.subcategory_objects.get(previous_category.name, [])
                 for subcategory in old_subcategories:
-                    if subcategory.alpha > 0:
-                        subcategory.alpha = max(0, self.xmb.animation_manager.lerp_alpha(
-                            subcategory.alpha, 0
-                        ))
-            
-            # Новые подкатегории появляются
-            if current_category.subcategories:
-                new_subcategories = self.xmb.subcategory_objects.get(current_category.name, [])
-                for subcategory in new_subcategories:
-                    if subcategory.alpha < 255:
-                        subcategory.alpha = min(255, self.xmb.animation_manager.lerp_alpha(
-                            subcategory.alpha, 255
-                        ))
-        else:
-            # Если категория не менялась, все подкатегории должны быть полностью видимы
-            if current_category.subcategories:
-                subcategories = self.xmb.subcategory_objects.get(current_category.name, [])
-                for subcategory in subcategories:
-                    if subcategory.alpha < 255:
-                        subcategory.alpha = min(255, self.xmb.animation_manager.lerp_alpha(
-                            subcategory.alpha, 255
-                        ))
+                    self.scheduler.animate(subcategory, "alpha", 0, "alpha", "fade")
+        
+        # Новые (или текущие) подкатегории появляются
+        if current_category.subcategories:
+            new_subcategories = self.xmb.subcategory_objects.get(current_category.name, [])
+            for subcategory in new_subcategories:
+                self.scheduler.animate(subcategory, "alpha", 255, "alpha", "fade")
     
     def update_interface_offset(self):
         """Обновление анимации сдвига интерфейса"""
-        self.xmb.interface_offset = self.xmb.animation_manager.lerp_offset(
-            self.xmb.interface_offset, self.xmb.target_offset
-        )
\ No newline at end of file
+        self.scheduler.animate(self.xmb, "interface_offset", self.xmb.target_offset, "offset", "interface")
+    
+    def step(self):
+        """Один шаг анимаций, которые еще не успокоились"""
+        self.scheduler.step()
+    
+    def is_settled(self):
+        """Все элементы интерфейса достигли своих целей"""
+        return self.scheduler.is_settled()
+    
+    def invalidate(self):
+        """Принудительный пересчет целей на следующем кадре (после изменения данных меню)"""
+        self.category_state = None
+        self.subcategory_state = None
+        self.option_state = None
+        self.fade_state = None
+        self.layout.invalidate()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# xmb_boot.py
+import time
+import threading
+from config import *
+from data.menu_data import load_menu_data
+
+class XMBBootLoader:
+    """Поэтапная загрузка меню во время вступительной анимации.
+    В фоновом потоке: разбор данных меню и построение свечения; в главном потоке
+    (poll) готовые данные применяются к интерфейсу и запускается загрузка иконок"""
+    
+    def __init__(self, xmb_interface):
+        self.xmb = xmb_interface
+        self.thread = None
+        self.error = None
+        
+        # Результаты фоновых этапов
+        self.menu_data = None
+        self.glow_surfaces = None
+        
+        # Меню применено к интерфейсу (можно рисовать и навигировать)
+        self.menu_ready = False
+        self.ready_time = 0.0
+        
+        # Длительность этапов, мс
+        self.timings = {}
+    
+    def start(self):
+        """Запуск фоновых этапов"""
+        self.thread = threading.Thread(target=self._run, name="XMBBoot", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Фоновый поток: этапы, не трогающие экран и состояние интерфейса"""
+        try:
+            stage_start = time.perf_counter()
+            self.menu_data = load_menu_data()
+            self._mark("menu data", stage_start)
+            
+            # Свечение и его уровни прозрачности; главный поток не трогает кэш спрайтов,
+            # пока меню не применено
+            stage_start = time.perf_counter()
+            glow_surfaces = self.xmb.animation_manager.create_glow_surfaces()
+            for size, glow_surface in glow_surfaces.items():
+                self.xmb.sprite_cache.prebuild(("glow", size), glow_surface)
+            self.glow_surfaces = glow_surfaces
+            self._mark("glow", stage_start)
+        except Exception as e:
+            self.error = e
+    
+    def _mark(self, stage, stage_start):
+        """Запись длительности этапа"""
+        self.timings[stage] = (time.perf_counter() - stage_start) * 1000
+    
+    def poll(self):
+        """Главный поток: применение данных, как только фоновые этапы завершены"""
+        if self.menu_ready or self.thread is None or self.thread.is_alive():
+            return
+        self._apply()
+    
+    def wait(self):
+        """Ожидание загрузки меню (для скриптов без вступительной анимации)"""
+        if self.thread is not None:
+            self.thread.join()
+        self.poll()
+    
+    def _apply(self):
+        """Данные меню -> интерфейс; иконки дальше грузятся пулом IconManager"""
+        if self.error is not None:
+            # Ошибку фонового потока поднимаем в главном, как при обычной загрузке
+            raise self.error
+        
+        stage_start = time.perf_counter()
+        xmb = self.xmb
+        xmb.categories_data, xmb.subcategories_data, xmb.options_data, xmb.options_by_subcategory = self.menu_data
+        xmb.glow_surfaces = self.glow_surfaces
+        xmb._load_menu_icons()
+        xmb._initialize_interface()
+        self._mark("menu setup", stage_start)
+        
+        self.menu_ready = True
+        self.ready_time = time.monotonic()
+        if xmb.startup_timer is not None:
+            for stage, milliseconds in self.timings.items():
+                xmb.startup_timer.add(stage, milliseconds)
+        print("Boot: " + ", ".join(f"{stage} {ms:.0f} ms" for stage, ms in self.timings.items()))
+    
+    def is_complete(self):
+        """Заставку можно завершать: меню готово и иконки загружены
+        (или ждем их дольше STARTUP_ICON_WAIT - тогда они догрузятся уже в меню)"""
+        if not self.menu_ready:
+            return False
+        if not self.xmb.icon_manager.is_loading():
+            return True
+        return time.monotonic() - self.ready_time >= STARTUP_ICON_WAIT
\ No newline at end of file
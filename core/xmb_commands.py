@@ -5,11 +5,18 @@ import subprocess
 class XMBCommands:
     def __init__(self, xmb_interface):
         self.xmb = xmb_interface
+        
+        # Запущенные процессы - по ним лаунчер понимает, что игра еще идет
+        self.processes = []
+        
+        # Посредники запуска URI (xdg-open, steam, rundll32): передают команду
+        # и сразу завершаются, пока игра еще идет - за игру не считаются
+        self.forwarders = []
     
     def execute_command(self, command):
-        """Выполнение команды (exe, sh файл или Steam URI)"""
+        """Выполнение команды (exe, sh файл или Steam URI); True если запуск прошел без ошибок"""
         if not command:
-            return
+            return False
         
         try:
             print(f"Executing command: {command}")
@@ -24,8 +31,27 @@ class XMBCommands:
                 self._execute_generic_command(command)
                 
             print(f"Command executed successfully: {command}")
+            return True
         except Exception as e:
             print(f"Error executing command {command}: {e}")
+            return False
+    
+    def _start_process(self, args, forwarder=False, **kwargs):
+        """Запуск процесса с запоминанием для отслеживания его завершения.
+        forwarder - процесс только передает URI дальше, его завершение не значит, что игра закрыта"""
+        process = subprocess.Popen(args, **kwargs)
+        if forwarder:
+            self.forwarders.append(process)
+        else:
+            self.processes.append(process)
+        return process
+    
+    def poll_processes(self):
+        """Количество еще работающих запущенных процессов (посредники не считаются,
+        их только дожидаемся, чтобы не оставлять зомби)"""
+        self.forwarders = [process for process in self.forwarders if process.poll() is None]
+        self.processes = [process for process in self.processes if process.poll() is None]
+        return len(self.processes)
     
     def _execute_steam_command(self, command):
         """Обработка Steam URI"""
@@ -57,11 +83,11 @@ class XMBCommands:
                     break
             
             if steam_exe:
-                subprocess.Popen([steam_exe, command])
+                self._start_process([steam_exe, command], forwarder=True)
                 print(f"Successfully opened with Steam: {command}")
             else:
                 # Способ 3: Используем rundll32 для открытия URI
-                subprocess.Popen(['rundll32', 'url.dll,FileProtocolHandler', command])
+                self._start_process(['rundll32', 'url.dll,FileProtocolHandler', command], forwarder=True)
                 print(f"Successfully opened with rundll32: {command}")
                 
         except Exception as e2:
@@ -70,26 +96,26 @@ class XMBCommands:
     def _execute_steam_linux(self, command):
         """Обработка Steam на Linux"""
         try:
-            subprocess.Popen(['xdg-open', command])
+            self._start_process(['xdg-open', command], forwarder=True)
             print(f"Successfully opened with xdg-open: {command}")
         except FileNotFoundError:
             try:
-                subprocess.Popen(['steam', command])
+                self._start_process(['steam', command], forwarder=True)
                 print(f"Successfully opened with steam: {command}")
             except FileNotFoundError:
                 print(f"Neither xdg-open nor steam found for: {command}")
     
     def _execute_exe_command(self, command):
         """Для Windows exe файлов"""
-        subprocess.Popen([command], shell=True)
+        self._start_process([command], shell=True)
         print(f"Successfully executed EXE: {command}")
     
     def _execute_sh_command(self, command):
         """Для Linux/Mac sh файлов"""
-        subprocess.Popen(['sh', command])
+        self._start_process(['sh', command])
         print(f"Successfully executed SH: {command}")
     
     def _execute_generic_command(self, command):
         """Другие команды"""
-        subprocess.Popen(command.split())
+        self._start_process(command.split())
         print(f"Successfully executed command: {command}")
\ No newline at end of file
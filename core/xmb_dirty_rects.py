@@ -0,0 +1,84 @@
+# xmb_dirty_rects.py
+import pygame
+from config import *
+
+class DirtyRectTracker:
+    def __init__(self, screen_width, screen_height):
+        self.screen_rect = pygame.Rect(0, 0, screen_width, screen_height)
+        
+        # Элементы прошлого и текущего кадра: ключ -> (прямоугольник, состояние)
+        self.previous_items = {}
+        self.current_items = {}
+        
+        # Первый кадр всегда выводится целиком
+        self.full_redraw = True
+    
+    def begin_frame(self):
+        """Начало нового кадра"""
+        self.current_items = {}
+    
+    def mark(self, key, rect, state=None):
+        """Регистрация отрисованного элемента и состояния, влияющего на его пиксели"""
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        
+        # Несколько вызовов с одним ключом объединяются в одну область
+        entry = self.current_items.get(key)
+        if entry is not None:
+            old_rect, old_state = entry
+            if old_rect.width and old_rect.height:
+                rect = old_rect.union(rect) if rect.width and rect.height else old_rect
+            state = (old_state, state)
+        
+        self.current_items[key] = (rect, state)
+    
+    def get_previous_rects(self):
+        """Области, занятые элементами на прошлом кадре"""
+        return [rect for rect, state in self.previous_items.values() if rect.width and rect.height]
+    
+    def invalidate(self):
+        """Принудительное полное обновление экрана на следующем кадре"""
+        self.full_redraw = True
+    
+    def end_frame(self, force_full=False):
+        """Завершение кадра: список грязных областей или None для полного обновления"""
+        previous = self.previous_items
+        self.previous_items = self.current_items
+        
+        if force_full or self.full_redraw:
+            self.full_redraw = False
+            return None
+        
+        dirty = []
+        for key, (rect, state) in self.current_items.items():
+            old_entry = previous.get(key)
+            if old_entry is None:
+                dirty.append(rect)
+            elif old_entry[0] != rect or old_entry[1] != state:
+                # Элемент сдвинулся или изменился - обновляем старое и новое место
+                dirty.append(old_entry[0])
+                dirty.append(rect)
+        
+        # Исчезнувшие элементы нужно стереть
+        for key, (rect, state) in previous.items():
+            if key not in self.current_items:
+                dirty.append(rect)
+        
+        dirty = [rect for rect in dirty if rect.width > 0 and rect.height > 0]
+        return self._merge(dirty)
+    
+    def _merge(self, rects):
+        """Сокращение списка областей перед передачей в pygame.display.update"""
+        if not rects:
+            return []
+        
+        # Слишком много областей - одна общая область обходится дешевле
+        if len(rects) > DIRTY_RECT_MAX_RECTS:
+            rects = [rects[0].unionall(rects[1:])]
+        
+        # Если обновлять почти весь экран, выгоднее обычный flip
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        if dirty_area >= screen_area * DIRTY_RECT_FULL_UPDATE_RATIO:
+            return None
+        
+        return rects
\ No newline at end of file
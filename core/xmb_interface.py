@@ -2,6 +2,8 @@
 import pygame
 import sys
 import os
+import time
+import sqlite3
 
 # Обновленные импорты
 from config import *
@@ -9,10 +11,12 @@ from core.video_background import VideoBackground
 from models.xmb_item import XMBItem
 from models.xmb_subcategory import XMBSubcategory  
 from models.xmb_option import XMBOption
+from models.xmb_option_pages import PagedOptionList
 from ui.animation_manager import AnimationManager
 from ui.icon_manager import IconManager
 from ui.sound_manager import SoundManager
-from data.menu_data import get_categories_with_subs, get_subcategories_data, get_options_data
+from ui.label_cache import LabelCache
+from ui.sprite_cache import SpriteAlphaCache
 
 # Импорты из core модуля
 from core.xmb_navigation import XMBNavigation
@@ -20,20 +24,41 @@ from core.xmb_animations import XMBAnimations
 from core.xmb_renderer import XMBRenderer
 from core.xmb_startup import XMBStartup
 from core.xmb_commands import XMBCommands
+from core.xmb_layers import LayerManager
+from core.xmb_power import XMBPowerManager
+from core.xmb_boot import XMBBootLoader
+from core.xmb_menu_watcher import MenuWatcher
+from data.menu_data import load_menu_data, load_errors, MENU_STORE_PATH
+from data.menu_store import MenuStore
 
 class XMBInterface:
-    def __init__(self):
+    def __init__(self, startup_timer=None):
+        # Замер этапов запуска (StartupTimer, флаг --debug-startup)
+        self.startup_timer = startup_timer
+        self.first_frame_drawn = False
+        
+        phase_start = time.perf_counter()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("XMB Interface")
         self.clock = pygame.time.Clock()
+        self._measure_startup("window", phase_start)
         
         # Инициализация менеджеров
         self.animation_manager = AnimationManager()
         self.icon_manager = IconManager()
         self.sound_manager = SoundManager()
+        self.sprite_cache = SpriteAlphaCache()
+        self.label_cache = LabelCache(self.sprite_cache)
+        
+        # Постоянные слои для композитинга (без выделения поверхностей каждый кадр)
+        self.layers = LayerManager(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.layers.track(lambda: self.label_cache.misses)
+        self.layers.track(lambda: self.sprite_cache.copies)
         
         # Инициализация компонентов
+        phase_start = time.perf_counter()
         self.background = VideoBackground(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self._measure_startup("background", phase_start)
         self._initialize_resources()
         
         # Инициализация подсистем
@@ -42,9 +67,22 @@ class XMBInterface:
         self.renderer = XMBRenderer(self)
         self.startup = XMBStartup(self)
         self.commands = XMBCommands(self)
+        self.power = XMBPowerManager(self)
         
-        # Инициализация интерфейса
-        self._initialize_interface()
+        # Данные меню, свечение и иконки загружаются в фоне, пока идет заставка;
+        # интерфейс инициализируется, когда они готовы
+        self.categories = []
+        self.subcategory_objects = {}
+        self.option_objects = {}
+        self.menu_store = None
+        self.boot = XMBBootLoader(self)
+        self.boot.start()
+        
+        # Слежение за data/*.json: меню обновляется без перезапуска
+        self.menu_watcher = None
+        if MENU_HOT_RELOAD:
+            watched = (".json", os.path.splitext(MENU_STORE_FILE)[1]) if MENU_STORE else ".json"
+            self.menu_watcher = MenuWatcher(os.path.join(self.project_root, "data"), watched)
         
         # Кэш для свечения текста
         self.text_glow_cache = {}
@@ -53,36 +91,69 @@ class XMBInterface:
         """Инициализация всех ресурсов"""
         self.project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         resources_dir = os.path.join(self.project_root, "resources")
-    
-        # Загрузка конфигурационных данных
-        self.categories_data = get_categories_with_subs()
-        self.subcategories_data = get_subcategories_data()
-        self.options_data, self.options_by_subcategory = get_options_data()
-        
-        # Загрузка иконок
-        self.icons, self.option_icon = self.icon_manager.load_icons(
-            self.categories_data, 
-            self.subcategories_data, 
-            self.options_data, 
-            resources_dir
-        )
+        self.resources_dir = resources_dir
         
         # Загрузка звуков
+        phase_start = time.perf_counter()
         self.sounds = self.sound_manager.load_sounds(resources_dir)
         
         # Загрузка звука запуска
         self.startup_sound = self._load_startup_sound(resources_dir)
+        self._measure_startup("sounds", phase_start)
         
         # Создаем поверхность для легкого затемнения
         self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
         self.overlay.fill((0, 0, 0, 50))
         
-        # Загрузка шрифтов
+        # Загрузка шрифтов (нужны заставке с первого кадра)
+        phase_start = time.perf_counter()
         self._load_fonts()
+        self._measure_startup("fonts", phase_start)
         
-        # Создаем поверхности для свечения
-        self.glow_surfaces = self.animation_manager.create_glow_surfaces()
+        # Поверхности свечения строит XMBBootLoader
+        self.glow_surfaces = {}
         
+    def _measure_startup(self, phase, phase_start):
+        """Запись этапа запуска, если включен отчет --debug-startup"""
+        if self.startup_timer is not None:
+            self.startup_timer.measure(phase, phase_start)
+    
+    def _track_startup(self):
+        """Отметка первого кадра; отчет печатается, когда загружены меню и иконки"""
+        if not self.first_frame_drawn:
+            self.first_frame_drawn = True
+            self.startup_timer.mark("first frame")
+        
+        if self.boot.menu_ready and self.icon_manager.load_time is not None:
+            self.startup_timer.add("icons", self.icon_manager.load_time)
+            self.startup_timer.report()
+            self.startup_timer = None
+    
+    def _load_menu_icons(self):
+        """Загрузка иконок для текущих данных меню"""
+        self.icons, self.option_icon = self.icon_manager.load_icons(
+            self.categories_data, 
+            self.subcategories_data, 
+            self.options_data, 
+            self.resources_dir
+        )
+        
+        # Набор иконок перезагружен - варианты прозрачности иконок строим заново
+        self.sprite_cache.invalidate_group("icon")
+    
+    def load_menu(self, categories_data, subcategories_data, options_data, options_by_subcategory):
+        """Замена данных меню (например, синтетическими для бенчмарка) с пересборкой интерфейса"""
+        self.categories_data = categories_data
+        self.subcategories_data = subcategories_data
+        self.options_data = options_data
+        self.options_by_subcategory = options_by_subcategory
+        
+        self._load_menu_icons()
+        self.animations.scheduler.clear()
+        self.animations.invalidate()
+        self._initialize_interface()
+        self.renderer.dirty_rects.invalidate()
+    
     def _load_startup_sound(self, resources_dir):
         """Загрузка звука запуска"""
         sound_path = os.path.join(resources_dir, "sounds", "startup.mp3")
@@ -133,49 +204,170 @@ class XMBInterface:
         self.startup_sd_font = pygame.font.SysFont('Arial', STARTUP_SD_FONT_SIZE)
         self.startup_steam_deck_font = pygame.font.SysFont('Arial', STARTUP_STEAM_DECK_FONT_SIZE)
     
-    def _initialize_interface(self):
-        """Инициализация интерфейса с новой структурой"""
+    def _build_menu_objects(self, reuse=False):
+        """Создание объектов меню по данным. При reuse объекты с теми же именами
+        берутся из текущего меню (с их позициями и прозрачностью), меняются только данные"""
+        old_categories = {category.name: category for category in self.categories} if reuse else {}
+        old_subcategories = {sub.name: sub for subs in self.subcategory_objects.values() for sub in subs} if reuse else {}
+        old_options = {}
+        if reuse:
+            for options in self.option_objects.values():
+                # Из списков хранилища - только уже созданные страницы
+                for option in (options.get_loaded() if isinstance(options, PagedOptionList) else options):
+                    old_options[option.name] = option
+        
         # Создание объектов категорий
-        self.categories = []
+        categories = []
         for category_data in self.categories_data:
-            category = XMBItem(
-                name=category_data["name"],
-                icon=category_data.get("icon"),
-                subcategories=category_data["subcategories"]
-            )
-            self.categories.append(category)
+            category = old_categories.get(category_data["name"])
+            if category is None:
+                category = XMBItem(
+                    name=category_data["name"],
+                    icon=category_data.get("icon"),
+                    subcategories=category_data["subcategories"]
+                )
+            else:
+                category.icon_name = category_data.get("icon")
+                category.subcategories = category_data["subcategories"]
+                category.last_subcategory_index = min(category.last_subcategory_index, max(0, len(category.subcategories) - 1))
+            categories.append(category)
         
         # Создание объектов подкатегорий
-        self.subcategory_objects = {}
+        subcategory_objects = {}
         for sub_name, sub_data in self.subcategories_data.items():
             category_name = sub_data.get("category")
             if category_name:
-                if category_name not in self.subcategory_objects:
-                    self.subcategory_objects[category_name] = []
+                if category_name not in subcategory_objects:
+                    subcategory_objects[category_name] = []
                 
-                subcategory = XMBSubcategory(
-                    name=sub_name,
-                    icon=sub_data.get("icon"),
-                    subcategory_type=sub_data.get("type", 1),
-                    command=sub_data.get("command")
-                )
-                self.subcategory_objects[category_name].append(subcategory)
+                subcategory = old_subcategories.get(sub_name)
+                if subcategory is None:
+                    subcategory = XMBSubcategory(
+                        name=sub_name,
+                        icon=sub_data.get("icon"),
+                        subcategory_type=sub_data.get("type", 1),
+                        command=sub_data.get("command")
+                    )
+                else:
+                    subcategory.icon_name = sub_data.get("icon")
+                    subcategory.type = sub_data.get("type", 1)
+                    subcategory.command = sub_data.get("command")
+                subcategory_objects[category_name].append(subcategory)
         
         # Создание объектов опций
-        self.option_objects = {}
+        option_objects = {}
         for subcategory_name, option_names in self.options_by_subcategory.items():
             option_list = []
             for option_name in option_names:
                 opt_data = self.options_data.get(option_name, {})
-                option = XMBOption(
-                    name=option_name,
-                    icon=opt_data.get("icon"),
-                    command=opt_data.get("command")
-                )
+                option = old_options.get(option_name)
+                if option is None:
+                    option = XMBOption(
+                        name=option_name,
+                        icon=opt_data.get("icon"),
+                        command=opt_data.get("command")
+                    )
+                else:
+                    option.icon_name = opt_data.get("icon")
+                    option.command = opt_data.get("command")
                 option_list.append(option)
-            self.option_objects[subcategory_name] = option_list
+            option_objects[subcategory_name] = option_list
             print(f"Loaded {len(option_list)} options for subcategory: {subcategory_name}")
         
+        # Подкатегории из хранилища SQLite: опции читаются страницами по мере показа
+        for subcategory_name, sub_data in self.subcategories_data.items():
+            count = sub_data.get("stored_options")
+            if count and self._get_menu_store() is not None:
+                option_objects[subcategory_name] = PagedOptionList(
+                    self.menu_store, subcategory_name, count, MENU_STORE_PAGE_SIZE, MENU_STORE_MAX_PAGES,
+                    on_load=self._register_option_icons,
+                    on_evict=self.icon_manager.remove_icons,
+                    reuse=old_options
+                )
+                print(f"Paging {count} options for subcategory: {subcategory_name} from {MENU_STORE_FILE}")
+        
+        self.categories = categories
+        self.subcategory_objects = subcategory_objects
+        self.option_objects = option_objects
+    
+    def _get_menu_store(self):
+        """Хранилище опций только для чтения (открывается при первом обращении)"""
+        if self.menu_store is None:
+            try:
+                self.menu_store = MenuStore(MENU_STORE_PATH, readonly=True)
+            except sqlite3.Error as e:
+                print(f"Error opening {MENU_STORE_FILE}: {e}")
+        return self.menu_store
+    
+    def _register_option_icons(self, options_data):
+        """Иконки опций новой страницы хранилища"""
+        self.icon_manager.add_icons(options_data, self.resources_dir)
+    
+    def reload_menu(self):
+        """Горячая перезагрузка data/*.json: изменения применяются к текущим объектам,
+        иконки грузятся только для новых пунктов, выбор сохраняется, если пункт остался"""
+        menu = load_menu_data()
+        if load_errors:
+            # Файл мог быть прочитан посреди записи - оставляем текущее меню
+            print(f"Menu reload skipped, cannot read: {', '.join(load_errors)}")
+            return False
+        
+        # Текущий выбор по именам
+        category = self.categories[self.current_category_index]
+        subcategory_name = category.subcategories[self.current_subcategory_index] if category.subcategories else None
+        current_options = self.get_current_options()
+        option_name = current_options[self.current_option_index].name if current_options else None
+        
+        self.categories_data, self.subcategories_data, self.options_data, self.options_by_subcategory = menu
+        
+        # Хранилище могли пересоздать - открываем заново
+        if self.menu_store is not None:
+            self.menu_store.close()
+            self.menu_store = None
+        self._build_menu_objects(reuse=True)
+        
+        # Категория: та же по имени, иначе ближайшая по индексу
+        names = [item.name for item in self.categories]
+        self.current_category_index = names.index(category.name) if category.name in names else min(self.current_category_index, len(names) - 1)
+        self.previous_category_index = self.current_category_index
+        category = self.categories[self.current_category_index]
+        
+        if subcategory_name in category.subcategories:
+            self.current_subcategory_index = category.subcategories.index(subcategory_name)
+        else:
+            self.current_subcategory_index = min(self.current_subcategory_index, max(0, len(category.subcategories) - 1))
+            if self.navigation_level == 2:
+                # Открытой подкатегории больше нет - возвращаемся к списку подкатегорий
+                self.subcategory_selected = False
+                self.target_offset = 0
+                self.navigation_level = 1
+                self.show_options = False
+                self.current_option_index = 0
+        
+        if self.navigation_level == 2:
+            options = self.get_current_options()
+            try:
+                if isinstance(options, PagedOptionList):
+                    # Поиск запросом к базе, страницы не загружаются
+                    self.current_option_index = options.index_of(option_name)
+                else:
+                    self.current_option_index = [option.name for option in options].index(option_name)
+            except ValueError:
+                self.current_option_index = min(self.current_option_index, max(0, len(options) - 1))
+        
+        # Иконки: только новые пункты и пункты со сменившимся файлом
+        added = self.icon_manager.update_icons(self.categories_data, self.subcategories_data, self.options_data, self.resources_dir)
+        self.sprite_cache.invalidate_group("icon")
+        
+        self.animations.invalidate()
+        self.renderer.dirty_rects.invalidate()
+        print(f"Menu reloaded: {len(self.options_data)} options, {added} new icons")
+        return True
+    
+    def _initialize_interface(self):
+        """Инициализация интерфейса с новой структурой"""
+        self._build_menu_objects()
+        
         # Инициализация навигации
         self.current_category_index = 5
         self.current_subcategory_index = 0
@@ -225,7 +417,7 @@ class XMBInterface:
         self.animations.update_interface_offset()
     
     def execute_command(self, command):
-        self.commands.execute_command(command)
+        return self.commands.execute_command(command)
     
     def draw_glow(self, screen, x, y, level_type="category", icon_size=None):
         # Реализация метода draw_glow (можно тоже вынести при желании)
@@ -248,7 +440,8 @@ class XMBInterface:
                 icon_size = CATEGORY_ICON_SIZE[0]
 
         if len(glow_sizes) < 3:
-            return
+            # Свечение не рисуется - пустая область для учета грязных прямоугольников
+            return pygame.Rect(0, 0, 0, 0)
 
         glow_size_small = glow_sizes[0]
         glow_size_medium = glow_sizes[1]
@@ -276,25 +469,27 @@ class XMBInterface:
         pulse_alpha_medium = int(150 * pulse_factor)
         pulse_alpha_large = int(120 * pulse_factor)
 
-        # Создаем копии поверхностей с пульсирующей прозрачностью
+        # Общая область свечения (нужна для dirty rect отрисовки)
+        glow_rect = pygame.Rect(icon_center_x, icon_center_y, 0, 0)
+        
+        # Берем готовые варианты поверхностей с пульсирующей прозрачностью
         if glow_size_small in self.glow_surfaces:
-            glow_small = self.glow_surfaces[glow_size_small].copy()
-            glow_small.set_alpha(pulse_alpha_small)
-            screen.blit(glow_small, (glow_x_small, glow_y_small))
+            glow_small = self.sprite_cache.get(("glow", glow_size_small), self.glow_surfaces[glow_size_small], pulse_alpha_small)
+            glow_rect.union_ip(screen.blit(glow_small, (glow_x_small, glow_y_small)))
         
         if glow_size_medium in self.glow_surfaces:
-            glow_medium = self.glow_surfaces[glow_size_medium].copy()
-            glow_medium.set_alpha(pulse_alpha_medium)
-            screen.blit(glow_medium, (glow_x_medium, glow_y_medium))
+            glow_medium = self.sprite_cache.get(("glow", glow_size_medium), self.glow_surfaces[glow_size_medium], pulse_alpha_medium)
+            glow_rect.union_ip(screen.blit(glow_medium, (glow_x_medium, glow_y_medium)))
         
         if glow_size_large in self.glow_surfaces:
-            glow_large = self.glow_surfaces[glow_size_large].copy()
-            glow_large.set_alpha(pulse_alpha_large)
-            screen.blit(glow_large, (glow_x_large, glow_y_large))
+            glow_large = self.sprite_cache.get(("glow", glow_size_large), self.glow_surfaces[glow_size_large], pulse_alpha_large)
+            glow_rect.union_ip(screen.blit(glow_large, (glow_x_large, glow_y_large)))
+        
+        return glow_rect
     
     def draw_text_with_glow(self, text, font, color, position, is_selected, alignment='center'):
         # Реализация метода draw_text_with_glow
-        text_surface = font.render(text, True, color)
+        text_surface = self.label_cache.render(font, text, color)
         text_width, text_height = text_surface.get_size()
         
         if is_selected:
@@ -310,8 +505,7 @@ class XMBInterface:
             pulse_factor = self.animation_manager.get_pulse_factor()
             glow_alpha = int(200 * pulse_factor)
             
-            glow_surface_copy = glow_surface.copy()
-            glow_surface_copy.set_alpha(glow_alpha)
+            glow_surface_copy = self.sprite_cache.get(("text_glow", cache_key), glow_surface, glow_alpha)
             
             # Позиционируем свечение
             if alignment == 'center':
@@ -335,15 +529,17 @@ class XMBInterface:
         self.screen.blit(text_surface, text_rect)
         return text_rect
     
+    def is_settled(self):
+        """Интерфейс полностью неподвижен: заставка завершена и все анимации достигли целей"""
+        return not self.startup.is_active() and self.animations.is_settled()
+    
     def has_options(self, subcategory_name):
         return subcategory_name in self.option_objects and len(self.option_objects[subcategory_name]) > 0
     
     def get_current_options(self):
         if self.navigation_level == 2 and self.categories[self.current_category_index].subcategories:
             subcategory_name = self.categories[self.current_category_index].subcategories[self.current_subcategory_index]
-            options = self.option_objects.get(subcategory_name, [])
-            print(f"Current subcategory: {subcategory_name}, options count: {len(options)}")
-            return options
+            return self.option_objects.get(subcategory_name, [])
         return []
     
     def execute_subcategory(self, subcategory_name):
@@ -377,22 +573,34 @@ class XMBInterface:
             if current_options:
                 option_obj = current_options[self.current_option_index]
                 if option_obj.command:
-                    self.execute_command(option_obj.command)
+                    launched = self.execute_command(option_obj.command)
                     self.sound_manager.play_sound("click")
+                    
+                    # Игра запущена - лаунчер уходит в фон до ее завершения или возврата фокуса
+                    if launched:
+                        self.power.enter_game_mode()
     
     def draw(self):
         """Основной метод отрисовки"""
-        # Очищаем экран
-        self.screen.fill(BLACK)
+        self.layers.begin_frame()
+        
+        # Применяем загруженные в фоне данные меню и подставляем готовые иконки
+        self.boot.poll()
+        self.icon_manager.poll()
         
         if self.startup.is_active():
+            # Очищаем экран
+            self.screen.fill(BLACK)
+            
             # Вступительная анимация
             self.startup.update()
             self.startup.draw()
             self.main_menu_alpha = self.startup.get_main_menu_alpha()
         else:
-            # Основное меню
+            # Основное меню: выводим только изменившиеся области
             self.renderer.draw_main_menu()
+            self.renderer.present()
+            return
         
         pygame.display.flip()
     
@@ -400,10 +608,26 @@ class XMBInterface:
         running = True
         while running:
             running = self.handle_events()
-            self.draw()
-            self.clock.tick(FPS)
+            
+            # Данные меню изменились на диске (например, после сканирования Steam)
+            if self.menu_watcher is not None and self.boot.menu_ready and self.menu_watcher.poll():
+                self.reload_menu()
+            
+            # Пока идет запущенная игра, кадры не рисуются
+            if not self.power.is_suspended():
+                self.draw()
+                if self.startup_timer is not None:
+                    self._track_startup()
+            
+            # В простое снижаем частоту кадров или спим до следующего события
+            self.power.tick()
         
         # Останавливаем видео перед выходом
         self.background.stop()
+        self.icon_manager.stop()
+        if self.menu_watcher is not None:
+            self.menu_watcher.close()
+        if self.menu_store is not None:
+            self.menu_store.close()
         pygame.quit()
         sys.exit()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# xmb_layers.py
+import pygame
+
+class LayerManager:
+    def __init__(self, width, height):
+        self.size = (width, height)
+        self.layers = {}
+        self.layer_flags = {}
+        
+        # Счетчики созданных слоев: всего и за текущий кадр
+        self.surface_allocations = 0
+        self.frame_allocations = 0
+        
+        # Поверхности создают и кэши (надписи, варианты прозрачности) - их счетчики
+        # учитываются в статистике, чтобы она показывала все выделения за кадр
+        self.counters = []
+        self.frame_start_count = 0
+    
+    def track(self, counter):
+        """Учет поверхностей, созданных вне слоев: counter() - сколько создано всего"""
+        self.counters.append(counter)
+    
+    def _count_tracked(self):
+        """Сколько поверхностей создали отслеживаемые кэши"""
+        return sum(counter() for counter in self.counters)
+    
+    def begin_frame(self):
+        """Начало нового кадра - сброс покадрового счетчика"""
+        self.frame_allocations = 0
+        self.frame_start_count = self._count_tracked()
+    
+    def get_layer(self, name, flags=0, fill=None, size=None):
+        """Получение долгоживущего слоя; поверхность создается только при первом обращении"""
+        size = size or self.size
+        layer = self.layers.get(name)
+        
+        # Флаги поверхности меняются после set_alpha, поэтому сравниваем запрошенные
+        if layer is None or layer.get_size() != size or self.layer_flags[name] != flags:
+            layer = pygame.Surface(size, flags)
+            if fill is not None:
+                layer.fill(fill)
+            self.layers[name] = layer
+            self.layer_flags[name] = flags
+            self.surface_allocations += 1
+            self.frame_allocations += 1
+        
+        return layer
+    
+    def release(self, name=None):
+        """Освобождение одного слоя или всех слоев"""
+        if name is None:
+            self.layers.clear()
+            self.layer_flags.clear()
+        else:
+            self.layers.pop(name, None)
+            self.layer_flags.pop(name, None)
+    
+    def get_stats(self):
+        """Статистика выделения поверхностей: слои и отслеживаемые кэши"""
+        tracked = self._count_tracked()
+        return {
+            "layers": len(self.layers),
+            "surface_allocations": self.surface_allocations + tracked,
+            "frame_allocations": self.frame_allocations + tracked - self.frame_start_count,
+        }
\ No newline at end of file
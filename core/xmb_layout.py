@@ -0,0 +1,51 @@
+# xmb_layout.py
+from config import *
+
+class XMBLayout:
+    def __init__(self):
+        # Кэш целевых позиций: пересчет только при смене списка или выбора
+        self.subcategory_key = None
+        self.subcategory_targets = []
+        self.option_key = None
+        self.option_targets = []
+        
+        # Сколько раз позиции действительно пересчитывались
+        self.recalculations = 0
+    
+    def subcategory_offset(self, index, selected_index):
+        """Смещение подкатегории относительно выбранной (в закрытой форме).
+        Перед выбранной подкатегорией расстояние увеличено"""
+        if index < selected_index:
+            return -((selected_index - index) * SUBCATEGORY_SPACING + SUBCATEGORY_SELECTED_EXTRA_SPACING)
+        return (index - selected_index) * SUBCATEGORY_SPACING
+    
+    def option_offset(self, index, selected_index):
+        """Смещение опции относительно выбранной"""
+        return (index - selected_index) * OPTION_SPACING
+    
+    def get_subcategory_targets(self, list_key, count, selected_index, anchor_y):
+        """Целевые Y всех подкатегорий списка"""
+        key = (list_key, count, selected_index, anchor_y)
+        if key != self.subcategory_key:
+            self.subcategory_targets = [
+                anchor_y + self.subcategory_offset(i, selected_index) for i in range(count)
+            ]
+            self.subcategory_key = key
+            self.recalculations += 1
+        return self.subcategory_targets
+    
+    def get_option_targets(self, list_key, selected_index, first, last, anchor_y=OPTION_SELECTION_Y):
+        """Целевые Y опций окна [first, last); элемент k списка соответствует индексу first + k"""
+        key = (list_key, selected_index, first, last, anchor_y)
+        if key != self.option_key:
+            self.option_targets = [
+                anchor_y + self.option_offset(i, selected_index) for i in range(first, last)
+            ]
+            self.option_key = key
+            self.recalculations += 1
+        return self.option_targets
+    
+    def invalidate(self):
+        """Сброс кэша (например, после перезагрузки меню)"""
+        self.subcategory_key = None
+        self.option_key = None
\ No newline at end of file
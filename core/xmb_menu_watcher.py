@@ -0,0 +1,155 @@
+# xmb_menu_watcher.py
+import os
+import sys
+import time
+import struct
+import ctypes
+import ctypes.util
+from config import *
+
+# Константы inotify из <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class MenuWatcher:
+    """Слежение за файлами данных меню (data/*.json): inotify на Linux, иначе
+    опрос времени изменения. poll() вызывается из главного цикла и один раз
+    сообщает о серии изменений, когда файлы перестали меняться"""
+    
+    def __init__(self, directory, suffix=".json"):
+        self.directory = directory
+        # Окончание имени файла или кортеж окончаний (как в str.endswith)
+        self.suffix = suffix
+        self.fd = None
+        
+        # Время последнего изменения, которое еще не применено
+        self.changed_at = None
+        
+        # Запасной вариант: снимок (время изменения, размер) файлов
+        self.last_scan = time.monotonic()
+        self.files = self._scan()
+        
+        self._open_inotify()
+    
+    def _open_inotify(self):
+        """Подписка на события каталога через inotify (ctypes, без зависимостей)"""
+        if not sys.platform.startswith("linux"):
+            print(f"Menu watcher: polling {self.directory} every {MENU_WATCH_POLL_INTERVAL} s")
+            return
+        
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            if libc.inotify_add_watch(fd, os.fsencode(self.directory), mask) < 0:
+                error = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(error, "inotify_add_watch failed")
+        except (OSError, AttributeError) as e:
+            print(f"Menu watcher: inotify unavailable ({e}), polling every {MENU_WATCH_POLL_INTERVAL} s")
+            return
+        
+        self.fd = fd
+        print(f"Menu watcher: watching {self.directory} with inotify")
+    
+    def _read_events(self):
+        """Чтение накопившихся событий inotify: имена затронутых файлов данных,
+        None - очередь переполнилась и события потеряны"""
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                offset += INOTIFY_EVENT.size + length
+                
+                # Переполнение очереди - события потеряны, проверяем весь каталог
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                name = name.decode("utf-8", "replace")
+                if name.endswith(self.suffix):
+                    names.add(name)
+        return names
+    
+    def _scan(self):
+        """Время изменения и размер файлов данных"""
+        files = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return files
+        
+        for name in names:
+            if name.endswith(self.suffix):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                    files[name] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    pass
+        return files
+    
+    def _update_files(self, names=None):
+        """Обновление снимка файлов; True если время изменения или размер
+        какого-то файла стали другими. names - проверить только эти файлы"""
+        if names is None:
+            files = self._scan()
+            changed = files != self.files
+            self.files = files
+            return changed
+        
+        changed = False
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+                entry = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                entry = None
+            
+            if entry != self.files.get(name):
+                changed = True
+                if entry is None:
+                    self.files.pop(name, None)
+                else:
+                    self.files[name] = entry
+        return changed
+    
+    def poll(self):
+        """True, если файлы менялись и уже MENU_RELOAD_DEBOUNCE секунд стоят на месте
+        (сканер мог записать несколько файлов подряд)"""
+        now = time.monotonic()
+        if self.fd is not None:
+            # Событие без смены времени изменения и размера (например, файл только
+            # открывали и закрывали) изменением не считается
+            names = self._read_events()
+            if (names is None or names) and self._update_files(names):
+                self.changed_at = now
+        elif now - self.last_scan >= MENU_WATCH_POLL_INTERVAL:
+            self.last_scan = now
+            if self._update_files():
+                self.changed_at = now
+        
+        if self.changed_at is not None and now - self.changed_at >= MENU_RELOAD_DEBOUNCE:
+            self.changed_at = None
+            return True
+        return False
+    
+    def close(self):
+        """Освобождение дескриптора inotify"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
\ No newline at end of file
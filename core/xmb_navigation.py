@@ -2,6 +2,14 @@
 import pygame
 from config import *
 
+# События, которые считаются действиями пользователя
+INPUT_EVENT_TYPES = (
+    pygame.KEYDOWN, pygame.KEYUP,
+    pygame.JOYBUTTONDOWN, pygame.JOYAXISMOTION, pygame.JOYHATMOTION,
+    pygame.CONTROLLERBUTTONDOWN, pygame.CONTROLLERAXISMOTION,
+    pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION,
+)
+
 class XMBNavigation:
     def __init__(self, xmb_interface):
         self.xmb = xmb_interface
@@ -10,8 +18,23 @@ class XMBNavigation:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            
+            # Любое событие ввода выводит интерфейс из режима простоя
+            if event.type in INPUT_EVENT_TYPES:
+                self.xmb.power.notify_input()
+            
+            # Потеря и возврат фокуса окна (например, его перекрыла запущенная игра)
+            if event.type == pygame.WINDOWFOCUSLOST:
+                self.xmb.power.notify_focus(False)
+            
+            elif event.type == pygame.WINDOWFOCUSGAINED:
+                self.xmb.power.notify_focus(True)
                 
             elif event.type == pygame.KEYDOWN:
+                # Пока меню загружается, навигировать нечем
+                if not self.xmb.boot.menu_ready:
+                    continue
+                
                 if event.key == pygame.K_ESCAPE:
                     return self._handle_escape()
                         
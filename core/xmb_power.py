@@ -0,0 +1,168 @@
+# xmb_power.py
+import time
+import pygame
+from config import *
+
+class XMBPowerManager:
+    def __init__(self, xmb_interface):
+        self.xmb = xmb_interface
+        self.last_input_time = time.monotonic()
+        self.set_profile(POWER_PROFILE)
+        
+        # Режим запущенной игры: фон на паузе, кадры не рисуются
+        self.game_mode = False
+        self.game_mode_start = 0.0
+        self.game_mode_processes = 0
+        self.window_focused = True
+        
+        # Подстройка качества видеофона по доле пропущенных кадров
+        self.quality_check_time = time.monotonic()
+        self.quality_check_frames = (0, 0)
+        self.quality_clean_checks = 0
+        
+        # Гистерезис: если повышенный уровень снова не справился вскоре после
+        # повышения, следующее повышение ждет вдвое дольше - уровни не переключаются туда-обратно
+        self.quality_recover_checks = VIDEO_QUALITY_RECOVER_CHECKS
+        self.quality_raise_time = None
+    
+    def set_profile(self, name):
+        """Выбор профиля питания (можно менять на лету)"""
+        if name not in POWER_PROFILES:
+            print(f"Warning: Unknown power profile '{name}', using 'balanced'")
+            name = "balanced"
+        self.profile_name = name
+        self.profile = POWER_PROFILES[name]
+    
+    def notify_input(self):
+        """Пользователь что-то нажал - сразу возвращаемся к полной частоте"""
+        self.last_input_time = time.monotonic()
+    
+    def notify_focus(self, focused):
+        """Окно лаунчера получило или потеряло фокус"""
+        self.window_focused = focused
+        if focused:
+            self.leave_game_mode("focus regained")
+        else:
+            self.enter_game_mode()
+    
+    def enter_game_mode(self):
+        """Игра запущена или окно ушло в фон: останавливаем видео и отрисовку"""
+        if not GAME_MODE_ENABLED or self.game_mode:
+            return
+        self.game_mode = True
+        self.game_mode_start = time.monotonic()
+        self.game_mode_processes = self.xmb.commands.poll_processes()
+        self.xmb.background.pause()
+        print("Game mode: launcher suspended")
+    
+    def leave_game_mode(self, reason):
+        """Возврат к полной работе с перерисовкой всего экрана"""
+        if not self.game_mode:
+            return
+        self.game_mode = False
+        self.xmb.background.resume()
+        self.xmb.renderer.dirty_rects.invalidate()
+        self.last_input_time = time.monotonic()
+        print(f"Game mode: launcher resumed ({reason})")
+    
+    def is_suspended(self):
+        """Лаунчер в фоне за запущенной игрой"""
+        return self.game_mode
+    
+    def _update_game_mode(self):
+        """Проверка завершения запущенных процессов. Игры из Steam URI запускаются
+        через посредников, процесса игры у лаунчера нет - для них выход только по фокусу"""
+        processes = self.xmb.commands.poll_processes()
+        if self.game_mode_processes > 0 and processes == 0:
+            self.leave_game_mode("game exited")
+        elif processes == 0 and self.window_focused and time.monotonic() - self.game_mode_start > GAME_MODE_LAUNCH_TIMEOUT:
+            # Игра так и не забрала фокус (например, запуск не удался)
+            self.leave_game_mode("launch timeout")
+        self.game_mode_processes = processes
+    
+    def _update_video_quality(self):
+        """Раз в VIDEO_QUALITY_CHECK_INTERVAL: понижение уровня видеофона, если кадры
+        пропускаются, и возврат к уровню из конфига после долгой работы без пропусков"""
+        now = time.monotonic()
+        if now - self.quality_check_time < VIDEO_QUALITY_CHECK_INTERVAL:
+            return
+        self.quality_check_time = now
+        
+        background = self.xmb.background
+        stats = background.get_stats()
+        frames = (stats["displayed"], stats["dropped"])
+        displayed = frames[0] - self.quality_check_frames[0]
+        dropped = frames[1] - self.quality_check_frames[1]
+        self.quality_check_frames = frames
+        
+        # Волны и градиент уровней не имеют; смена уровня еще не применена потоком видео
+        tiers = list(VIDEO_QUALITY_TIERS)
+        if stats["quality"] not in tiers or background.pending_quality is not None or displayed + dropped == 0:
+            return
+        
+        index = tiers.index(stats["quality"])
+        if dropped > (displayed + dropped) * VIDEO_QUALITY_DROP_RATIO:
+            self.quality_clean_checks = 0
+            if index + 1 < len(tiers):
+                if self.quality_raise_time is not None and now - self.quality_raise_time < self.quality_recover_checks * VIDEO_QUALITY_CHECK_INTERVAL:
+                    self.quality_recover_checks *= 2
+                else:
+                    self.quality_recover_checks = VIDEO_QUALITY_RECOVER_CHECKS
+                self.quality_raise_time = None
+                
+                # Декодер и так отстает - кэш кадров нового уровня не записываем
+                print(f"Video quality: {dropped} of {displayed + dropped} frames dropped, lowering to {tiers[index + 1]}")
+                background.set_quality(tiers[index + 1], record_cache=False)
+        elif dropped == 0:
+            self.quality_clean_checks += 1
+            configured = tiers.index(VIDEO_QUALITY) if VIDEO_QUALITY in tiers else 0
+            if index > configured and self.quality_clean_checks >= self.quality_recover_checks:
+                self.quality_clean_checks = 0
+                self.quality_raise_time = now
+                background.set_quality(tiers[index - 1])
+        else:
+            self.quality_clean_checks = 0
+    
+    def is_idle(self):
+        """Интерфейс простаивает: нет ввода, анимаций, видеофона и фоновой загрузки иконок"""
+        if time.monotonic() - self.last_input_time < self.profile["idle_delay"]:
+            return False
+        if self.xmb.background.is_animating():
+            return False
+        if self.xmb.icon_manager.is_loading():
+            return False
+        return self.xmb.is_settled()
+    
+    def tick(self):
+        """Ожидание следующего кадра с учетом простоя; возвращает прошедшее время в мс"""
+        if self.game_mode:
+            self._update_game_mode()
+        
+        if self.game_mode:
+            # Почти без нагрузки ждем возврата фокуса; завершение игры проверяем раз в GAME_MODE_WAIT
+            self._wait_for_event(GAME_MODE_WAIT)
+            return self.xmb.clock.tick()
+        
+        if VIDEO_QUALITY_ADAPTIVE:
+            self._update_video_quality()
+        
+        if not self.is_idle():
+            return self.xmb.clock.tick(self.profile["fps"])
+        
+        # Кадр ничего не изменил на экране (нет даже пульсации) - можно ждать дольше
+        if self.xmb.renderer.frame_was_static:
+            timeout = self.profile["static_wait"]
+        else:
+            timeout = 1.0 / self.profile["idle_fps"]
+        
+        if self.profile["wait_for_events"]:
+            self._wait_for_event(timeout)
+            return self.xmb.clock.tick()
+        
+        return self.xmb.clock.tick(1.0 / timeout)
+    
+    def _wait_for_event(self, timeout):
+        """Сон до прихода события или до таймаута; событие возвращается в очередь"""
+        event = pygame.event.wait(int(timeout * 1000))
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
\ No newline at end of file
@@ -0,0 +1,94 @@
+# xmb_profiling.py
+import time
+
+class FrameProfiler:
+    def __init__(self):
+        # Стадия -> список длительностей (мс) по кадрам
+        self.samples = {}
+        self.stages = []
+        self.last_mark = None
+    
+    def begin_frame(self):
+        """Начало замера кадра"""
+        self.last_mark = time.perf_counter()
+    
+    def mark(self, stage):
+        """Конец стадии: время с предыдущей отметки записывается в стадию"""
+        now = time.perf_counter()
+        if self.last_mark is not None:
+            if stage not in self.samples:
+                self.samples[stage] = []
+                self.stages.append(stage)
+            self.samples[stage].append((now - self.last_mark) * 1000)
+        self.last_mark = now
+    
+    def add_sample(self, stage, milliseconds):
+        """Запись готового замера (например, общего времени кадра)"""
+        if stage not in self.samples:
+            self.samples[stage] = []
+            self.stages.append(stage)
+        self.samples[stage].append(milliseconds)
+    
+    def reset(self):
+        """Сброс накопленной статистики (например, после прогрева)"""
+        self.samples = {}
+        self.stages = []
+        self.last_mark = None
+    
+    @staticmethod
+    def percentile(values, percent):
+        """Перцентиль по ближайшему рангу"""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+        return ordered[index]
+    
+    def get_report(self, percents=(50, 90, 99)):
+        """Статистика по стадиям: {стадия: {"p50": ..., "max": ..., "mean": ...}}"""
+        report = {}
+        for stage in self.stages:
+            values = self.samples[stage]
+            row = {f"p{percent}": self.percentile(values, percent) for percent in percents}
+            row["max"] = max(values)
+            row["mean"] = sum(values) / len(values)
+            row["frames"] = len(values)
+            report[stage] = row
+        return report
+
+class StartupTimer:
+    """Этапы запуска до первого кадра (отчет по флагу --debug-startup).
+    Время считается от start - момента запуска процесса до импортов"""
+    
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        
+        # (этап, длительность мс или None для отметки, время от старта мс)
+        self.phases = []
+        self.reported = False
+    
+    def measure(self, phase, phase_start, phase_end=None):
+        """Этап от phase_start до phase_end (perf_counter; по умолчанию - сейчас)"""
+        if phase_end is None:
+            phase_end = time.perf_counter()
+        self.phases.append((phase, (phase_end - phase_start) * 1000, (phase_end - self.start) * 1000))
+    
+    def add(self, phase, milliseconds):
+        """Этап, замеренный в другом месте (например, в фоновом потоке)"""
+        self.phases.append((phase, milliseconds, (time.perf_counter() - self.start) * 1000))
+    
+    def mark(self, phase):
+        """Отметка момента без длительности (например, первый кадр)"""
+        self.phases.append((phase, None, (time.perf_counter() - self.start) * 1000))
+    
+    def report(self):
+        """Печать отчета (один раз)"""
+        if self.reported:
+            return
+        self.reported = True
+        
+        print("\nStartup timing")
+        print(f"{'phase':<22}{'took ms':>10}{'at ms':>10}")
+        for phase, milliseconds, at in self.phases:
+            took = f"{milliseconds:.1f}" if milliseconds is not None else "-"
+            print(f"{phase:<22}{took:>10}{at:>10.1f}")
\ No newline at end of file
@@ -1,19 +1,59 @@
 # xmb_renderer.py
 import pygame
 from config import *
+from core.xmb_dirty_rects import DirtyRectTracker
+from ui.icon_manager import PRIORITY_SELECTED, PRIORITY_VISIBLE
 
 class XMBRenderer:
     def __init__(self, xmb_interface):
         self.xmb = xmb_interface
+        
+        # Отслеживание изменившихся областей экрана
+        self.dirty_rects = DirtyRectTracker(self.xmb.screen.get_width(), self.xmb.screen.get_height())
+        
+        # Последний кадр не изменил на экране ни одного пикселя
+        self.frame_was_static = False
+        
+        # Кадр фона сменился на этом кадре; прошлый кадр рисовался прямо на экран
+        self.background_changed = False
+        self.screen_has_menu = False
+        
+        # Замер времени стадий кадра (FrameProfiler, используется бенчмарком)
+        self.profiler = None
+    
+    def _profile(self, stage):
+        """Отметка завершения стадии кадра, если включено профилирование"""
+        if self.profiler is not None:
+            self.profiler.mark(stage)
     
     def draw_main_menu(self):
         """Отрисовка основного меню с прозрачностью"""
-        # Создаем временную поверхность для основного меню
-        menu_surface = pygame.Surface((self.xmb.screen.get_width(), self.xmb.screen.get_height()), pygame.SRCALPHA)
+        if self.profiler is not None:
+            self.profiler.begin_frame()
+        self.dirty_rects.begin_frame()
+        
+        # После появления меню рисуем прямо на экран, без промежуточного слоя
+        if self.xmb.main_menu_alpha >= 255:
+            menu_surface = self.xmb.screen
+        else:
+            # Пока меню проявляется, используем постоянный слой с прозрачностью
+            menu_surface = self.xmb.layers.get_layer("menu", pygame.SRCALPHA)
+            menu_surface.fill((0, 0, 0, 0))
+        
+        # Если на экране прошлый кадр с тем же фоном, фон восстанавливается
+        # только под элементами прошлого кадра - остальные пиксели уже верные
+        restore_areas = None
+        if DIRTY_RECT_RENDERING and self.screen_has_menu and menu_surface is self.xmb.screen and not self.dirty_rects.full_redraw:
+            restore_areas = self.dirty_rects.get_previous_rects()
         
         # Отрисовываем фон (видео или градиент)
         self.xmb.background.update()
-        self.xmb.background.draw(menu_surface)
+        self.background_changed = self.xmb.background.draw(menu_surface, restore_areas)
+        self.screen_has_menu = menu_surface is self.xmb.screen
+        self._profile("background")
+        
+        # Фиксируем время кадра для анимаций
+        self.xmb.animation_manager.begin_frame()
         
         # Обновляем анимацию позиций
         self.xmb.animations.update_category_positions()
@@ -22,17 +62,40 @@ class XMBRenderer:
         self.xmb.animations.update_fade_animation()
         self.xmb.animations.update_interface_offset()
         
+        # Шаг только тех анимаций, которые еще не завершились
+        self.xmb.animations.step()
+        
         # Обновляем время для пульсации
         self.xmb.animation_manager.update_pulse()
+        self._profile("animations")
         
         # Рисуем все элементы
         self._draw_categories(menu_surface)
+        self._profile("categories")
         self._draw_subcategories(menu_surface)
+        self._profile("subcategories")
         self._draw_options(menu_surface)
+        self._profile("options")
         
         # Применяем прозрачность основного меню и рисуем на экран
-        menu_surface.set_alpha(self.xmb.main_menu_alpha)
-        self.xmb.screen.blit(menu_surface, (0, 0))
+        if menu_surface is not self.xmb.screen:
+            menu_surface.set_alpha(self.xmb.main_menu_alpha)
+            self.xmb.screen.fill(BLACK)
+            self.xmb.screen.blit(menu_surface, (0, 0))
+            self._profile("composite")
+    
+    def present(self):
+        """Вывод кадра на экран: только изменившиеся области или весь экран"""
+        # Новый кадр фона меняет весь экран - обновляем его целиком; пока кадр фона
+        # тот же, выводятся только области меню
+        force_full = not DIRTY_RECT_RENDERING or self.background_changed
+        dirty = self.dirty_rects.end_frame(force_full)
+        self.frame_was_static = dirty == []
+        
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
     
     def _draw_categories(self, surface):
         """Отрисовка категорий"""
@@ -41,26 +104,30 @@ class XMBRenderer:
             if self.xmb.subcategory_selected and i != self.xmb.current_category_index:
                 continue
                 
-            x = category.current_x
-            y = self.xmb.selection_y
+            # Целые координаты считаются один раз: по ним и рисуем, и отмечаем области
+            x = round(category.current_x)
+            y = round(self.xmb.selection_y)
+            
+            is_selected = (i == self.xmb.current_category_index)
             
-            # Рисуем иконку категории
-            icon = self.xmb.icons.get(category.name)
+            # Рисуем иконку категории (пока она грузится - заглушку; загруженная иконка
+            # меняет состояние элемента, и его область обновляется)
+            icon = self.xmb.icon_manager.get_icon(category.name, PRIORITY_SELECTED if is_selected else PRIORITY_VISIBLE)
             if icon:
-                # Применяем прозрачность к иконке
-                icon_with_alpha = icon.copy()
-                icon_with_alpha.set_alpha(category.alpha)
-                surface.blit(icon_with_alpha, (x + CATEGORY_ICON_X_OFFSET, y + CATEGORY_ICON_Y_OFFSET))
+                # Применяем прозрачность к иконке; варианты привязаны к поверхности,
+                # поэтому одинаковые иконки разных пунктов делят их
+                icon_with_alpha = self.xmb.sprite_cache.get(("icon", icon), icon, category.alpha)
+                icon_rect = surface.blit(icon_with_alpha, (x + CATEGORY_ICON_X_OFFSET, y + CATEGORY_ICON_Y_OFFSET))
+                self.dirty_rects.mark(("category", category.name, "icon"), icon_rect, (category.alpha, icon))
             
             # Рисуем название категории БЕЗ СВЕЧЕНИЯ
-            is_selected = (i == self.xmb.current_category_index)
             color = SELECTED_COLOR if is_selected else WHITE
             alpha = 255 if is_selected else 128
             
-            text_surface = self.xmb.title_font.render(category.name, True, color)
-            text_surface.set_alpha(alpha)
+            text_surface = self.xmb.label_cache.render(self.xmb.title_font, category.name, color, alpha)
             text_rect = text_surface.get_rect(center=(x, y + CATEGORY_TEXT_Y_OFFSET))
             surface.blit(text_surface, text_rect)
+            self.dirty_rects.mark(("category", category.name, "text"), text_rect, alpha)
     
     def _draw_subcategories(self, surface):
         """Отрисовка подкатегорий"""
@@ -69,10 +136,11 @@ class XMBRenderer:
             subcategories = self.xmb.subcategory_objects.get(category.name, [])
             
             # Рисуем подкатегории с анимацией
-            sub_x = self.xmb.selection_x + SUBCATEGORY_X_OFFSET - self.xmb.interface_offset
+            # Целые координаты считаются один раз: по ним и рисуем, и отмечаем области
+            sub_x = round(self.xmb.selection_x + SUBCATEGORY_X_OFFSET - self.xmb.interface_offset)
             for i, subcategory_obj in enumerate(subcategories):
                 subcategory = category.subcategories[i]
-                y_pos = subcategory_obj.current_y
+                y_pos = round(subcategory_obj.current_y)
                 
                 # Пропускаем подкатегории с нулевой прозрачностью
                 if subcategory_obj.alpha <= 0:
@@ -93,26 +161,28 @@ class XMBRenderer:
                     base_alpha = subcategory_obj.alpha
 
                 # Рисуем текст подкатегории
-                self._draw_subcategory_text(surface, subcategory, text_position, is_selected, should_glow, base_alpha)
+                text_rect = self._draw_subcategory_text(surface, subcategory, text_position, is_selected, should_glow, base_alpha)
+                self.dirty_rects.mark(("subcategory", subcategory, "text"), text_rect, (base_alpha, is_selected, should_glow))
                 
                 # Иконка подкатегории
-                icon = self.xmb.icons.get(subcategory)
+                icon = self.xmb.icon_manager.get_icon(subcategory, PRIORITY_SELECTED if is_selected else PRIORITY_VISIBLE)
                 if icon:
                     # Если подкатегория выбрана И НЕ ОТКРЫТЫ OPTIONS, рисуем пульсирующее свечение
                     if should_glow:
-                        self.xmb.draw_glow(surface, sub_x, y_pos + SUBCATEGORY_ICON_Y_OFFSET, "subcategory", SUBCATEGORY_ICON_SIZE[0])
+                        glow_rect = self.xmb.draw_glow(surface, sub_x, y_pos + SUBCATEGORY_ICON_Y_OFFSET, "subcategory", SUBCATEGORY_ICON_SIZE[0])
+                        self.dirty_rects.mark(("glow", "subcategory"), glow_rect, self.xmb.animation_manager.get_pulse_factor())
                     
                     # Применяем прозрачность к иконке
-                    icon_with_alpha = icon.copy()
-                    icon_with_alpha.set_alpha(base_alpha)
-                    surface.blit(icon_with_alpha, (sub_x, y_pos + SUBCATEGORY_ICON_Y_OFFSET))
+                    icon_with_alpha = self.xmb.sprite_cache.get(("icon", icon), icon, base_alpha)
+                    icon_rect = surface.blit(icon_with_alpha, (sub_x, y_pos + SUBCATEGORY_ICON_Y_OFFSET))
+                    self.dirty_rects.mark(("subcategory", subcategory, "icon"), icon_rect, (base_alpha, icon))
     
     def _draw_subcategory_text(self, surface, text, position, is_selected, should_glow, alpha):
         """Отрисовка текста подкатегории"""
         if should_glow:
             # Для текста со свечением
             color = SELECTED_COLOR if is_selected else WHITE
-            text_surface = self.xmb.subcategory_font.render(text, True, color)
+            text_surface = self.xmb.label_cache.render(self.xmb.subcategory_font, text, color)
             text_width, text_height = text_surface.get_size()
             
             # Создаем свечение для текста
@@ -124,8 +194,7 @@ class XMBRenderer:
             pulse_factor = self.xmb.animation_manager.get_pulse_factor()
             glow_alpha = int(200 * pulse_factor)
             
-            glow_surface_copy = glow_surface.copy()
-            glow_surface_copy.set_alpha(glow_alpha)
+            glow_surface_copy = self.xmb.sprite_cache.get(("text_glow", cache_key), glow_surface, glow_alpha)
             
             text_rect = text_surface.get_rect(midleft=position)
             glow_rect = glow_surface_copy.get_rect(
@@ -135,13 +204,14 @@ class XMBRenderer:
             
             surface.blit(glow_surface_copy, glow_rect)
             surface.blit(text_surface, text_rect)
+            self.dirty_rects.mark(("text_glow", "subcategory"), glow_rect, glow_alpha)
         else:
             # Без свечения
             color = SELECTED_COLOR if is_selected else WHITE
-            text_surface = self.xmb.subcategory_font.render(text, True, color)
-            text_surface.set_alpha(alpha)
+            text_surface = self.xmb.label_cache.render(self.xmb.subcategory_font, text, color, alpha)
             text_rect = text_surface.get_rect(midleft=position)
             surface.blit(text_surface, text_rect)
+        return text_rect
     
     def _draw_options(self, surface):
         """Отрисовка опций"""
@@ -152,14 +222,15 @@ class XMBRenderer:
                 option_objects = self.xmb.option_objects.get(subcategory_name, [])
                 
                 # Позиция для опций
-                option_x = self.xmb.selection_x + OPTION_X_OFFSET - self.xmb.interface_offset
+                # Целые координаты считаются один раз: по ним и рисуем, и отмечаем области
+                option_x = round(self.xmb.selection_x + OPTION_X_OFFSET - self.xmb.interface_offset)
                 
-                for i, option_obj in enumerate(option_objects):
-                    if i >= len(current_options):
-                        continue
-                        
+                # Рисуем только опции в видимом окне - стоимость не зависит от длины списка
+                first, last = self.xmb.animations.get_option_window()
+                for i in range(first, min(last, len(current_options))):
                     # option_obj - это объект XMBOption
-                    y_pos = option_obj.current_y - 50
+                    option_obj = option_objects[i]
+                    y_pos = round(option_obj.current_y) - 50
                     
                     is_selected = (i == self.xmb.current_option_index)
                     
@@ -167,33 +238,36 @@ class XMBRenderer:
                     should_glow = is_selected
                     
                     # Рисуем иконку опции
-                    option_icon = self.xmb.icons.get(option_obj.name)
+                    option_icon = self.xmb.icon_manager.get_icon(option_obj.name, PRIORITY_SELECTED if is_selected else PRIORITY_VISIBLE)
                     if option_icon:
                         # Если опция выбрана, рисуем пульсирующее свечение
                         if should_glow:
-                            self.xmb.draw_glow(surface, option_x + OPTION_ICON_X_OFFSET, y_pos + OPTION_ICON_Y_OFFSET, "option", OPTION_ICON_SIZE[0])
+                            glow_rect = self.xmb.draw_glow(surface, option_x + OPTION_ICON_X_OFFSET, y_pos + OPTION_ICON_Y_OFFSET, "option", OPTION_ICON_SIZE[0])
+                            self.dirty_rects.mark(("glow", "option"), glow_rect, self.xmb.animation_manager.get_pulse_factor())
                         
                         # Применяем прозрачность к иконке
-                        icon_with_alpha = option_icon.copy()
-                        icon_with_alpha.set_alpha(255 if is_selected else 128)
-                        surface.blit(icon_with_alpha, (option_x + OPTION_ICON_X_OFFSET, y_pos + OPTION_ICON_Y_OFFSET))
+                        icon_with_alpha = self.xmb.sprite_cache.get(("icon", option_icon), option_icon, 255 if is_selected else 128)
+                        icon_rect = surface.blit(icon_with_alpha, (option_x + OPTION_ICON_X_OFFSET, y_pos + OPTION_ICON_Y_OFFSET))
+                        self.dirty_rects.mark(("option", option_obj.name, "icon"), icon_rect, (is_selected, option_icon))
                     
                     # Рисуем название опции
                     text_position = (option_x + OPTION_TEXT_X_OFFSET, y_pos + OPTION_TEXT_Y_OFFSET)
-                    self._draw_option_text(surface, option_obj.name, text_position, is_selected, should_glow)
+                    text_rect = self._draw_option_text(surface, option_obj.name, text_position, is_selected, should_glow)
+                    self.dirty_rects.mark(("option", option_obj.name, "text"), text_rect, is_selected)
             else:
                 # Если опций нет, показываем сообщение
-                option_x = self.xmb.selection_x + OPTION_X_OFFSET - self.xmb.interface_offset
+                option_x = round(self.xmb.selection_x + OPTION_X_OFFSET - self.xmb.interface_offset)
                 option_y = OPTION_SELECTION_Y - 50
-                text_surface = self.xmb.option_font.render("No options available", True, WHITE)
+                text_surface = self.xmb.label_cache.render(self.xmb.option_font, "No options available", WHITE)
                 text_rect = text_surface.get_rect(midleft=(option_x + OPTION_TEXT_X_OFFSET, option_y))
                 surface.blit(text_surface, text_rect)
+                self.dirty_rects.mark(("option", None), text_rect)
     
     def _draw_option_text(self, surface, text, position, is_selected, should_glow):
         """Отрисовка текста опции"""
         if should_glow:
             color = SELECTED_COLOR if is_selected else WHITE
-            text_surface = self.xmb.option_font.render(text, True, color)
+            text_surface = self.xmb.label_cache.render(self.xmb.option_font, text, color)
             text_width, text_height = text_surface.get_size()
             
             # Создаем свечение для текста
@@ -205,8 +279,7 @@ class XMBRenderer:
             pulse_factor = self.xmb.animation_manager.get_pulse_factor()
             glow_alpha = int(200 * pulse_factor)
             
-            glow_surface_copy = glow_surface.copy()
-            glow_surface_copy.set_alpha(glow_alpha)
+            glow_surface_copy = self.xmb.sprite_cache.get(("text_glow", cache_key), glow_surface, glow_alpha)
             
             text_rect = text_surface.get_rect(midleft=position)
             glow_rect = glow_surface_copy.get_rect(
@@ -216,10 +289,11 @@ class XMBRenderer:
             
             surface.blit(glow_surface_copy, glow_rect)
             surface.blit(text_surface, text_rect)
+            self.dirty_rects.mark(("text_glow", "option"), glow_rect, glow_alpha)
         else:
             # Без свечения
             color = SELECTED_COLOR if is_selected else WHITE
-            text_surface = self.xmb.option_font.render(text, True, color)
-            text_surface.set_alpha(128)  # полупрозрачный для невыбранных
+            text_surface = self.xmb.label_cache.render(self.xmb.option_font, text, color, 128)  # полупрозрачный для невыбранных
             text_rect = text_surface.get_rect(midleft=position)
-            surface.blit(text_surface, text_rect)
\ No newline at end of file
+            surface.blit(text_surface, text_rect)
+        return text_rect
\ No newline at end of file
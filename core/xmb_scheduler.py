@@ -0,0 +1,74 @@
+# xmb_scheduler.py
+from config import *
+
+class AnimationScheduler:
+    def __init__(self, animation_manager):
+        self.animation_manager = animation_manager
+        
+        # Активные анимации по группам: (id объекта, атрибут) -> (объект, атрибут, цель, вид)
+        self.groups = {}
+        
+        # Функции сглаживания и пороги "успокоения" для каждого вида анимации
+        self.lerps = {
+            "position": animation_manager.lerp_position,
+            "alpha": animation_manager.lerp_alpha,
+            "offset": animation_manager.lerp_offset,
+        }
+        self.thresholds = {
+            "position": ANIMATION_SETTLE_POSITION,
+            "alpha": ANIMATION_SETTLE_ALPHA,
+            "offset": ANIMATION_SETTLE_POSITION,
+        }
+    
+    def animate(self, obj, attr, target, kind="position", group="default"):
+        """Запуск (или перенацеливание) анимации атрибута к цели"""
+        key = (id(obj), attr)
+        tracks = self.groups.setdefault(group, {})
+        
+        if getattr(obj, attr) == target:
+            tracks.pop(key, None)
+            return
+        
+        tracks[key] = (obj, attr, target, kind)
+    
+    def snap(self, obj, attr, value, group="default"):
+        """Мгновенная установка значения без анимации"""
+        setattr(obj, attr, value)
+        self.cancel(obj, attr, group)
+    
+    def cancel(self, obj, attr, group="default"):
+        """Остановка анимации атрибута на текущем значении"""
+        tracks = self.groups.get(group)
+        if tracks:
+            tracks.pop((id(obj), attr), None)
+    
+    def step(self):
+        """Один шаг всех активных анимаций; успокоившиеся удаляются из активного набора"""
+        for tracks in self.groups.values():
+            settled = []
+            for key, (obj, attr, target, kind) in tracks.items():
+                value = self.lerps[kind](getattr(obj, attr), target)
+                
+                # Сглаживание никогда не достигает цели точно - доводим по порогу
+                if abs(target - value) < self.thresholds[kind]:
+                    value = target
+                    settled.append(key)
+                
+                setattr(obj, attr, value)
+            
+            for key in settled:
+                del tracks[key]
+    
+    def is_settled(self, group=None):
+        """Нет ли активных анимаций (во всех группах или в одной)"""
+        if group is not None:
+            return not self.groups.get(group)
+        return not any(self.groups.values())
+    
+    def active_count(self):
+        """Количество анимаций в движении"""
+        return sum(len(tracks) for tracks in self.groups.values())
+    
+    def clear(self):
+        """Остановка всех анимаций"""
+        self.groups.clear()
\ No newline at end of file
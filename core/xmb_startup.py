@@ -1,5 +1,4 @@
 # xmb_startup.py
-import pygame
 import time
 from config import *
 
@@ -19,6 +18,11 @@ class XMBStartup:
         current_time = time.time()
         elapsed = current_time - self.start_time
         
+        # Меню загружено раньше конца заставки - при включенном пропуске сразу показываем его
+        if STARTUP_SKIP_WHEN_LOADED and self.phase in ("black", "display") and self.xmb.boot.is_complete():
+            self.skip()
+            return
+        
         if self.phase == "black":
             self.alpha = int(255)
             
@@ -30,10 +34,8 @@ class XMBStartup:
                 self.phase = "display"
         
         elif self.phase == "display": 
-            self.phase = "display"
-            self.start_time = current_time
-            # Держим надпись 3 секунды
-            if elapsed >= STARTUP_DISPLAY_DURATION:
+            # Надпись сразу переходит в исчезновение; задерживаем ее, только пока меню еще грузится
+            if self.xmb.boot.is_complete():
                 self.phase = "fade_out"
                 self.start_time = current_time
         
@@ -56,10 +58,11 @@ class XMBStartup:
         self.xmb.background.update()
         self.xmb.background.draw(self.xmb.screen)
         
-        # Затем создаем поверхность для затемнения поверх фона
-        overlay = pygame.Surface((self.xmb.screen.get_width(), self.xmb.screen.get_height()), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, self.alpha))
-        self.xmb.screen.blit(overlay, (0, 0))
+        # Затем затемняем фон постоянным черным слоем с прозрачностью
+        if self.alpha > 0:
+            overlay = self.xmb.layers.get_layer("overlay", fill=BLACK)
+            overlay.set_alpha(self.alpha)
+            self.xmb.screen.blit(overlay, (0, 0))
         
         # Рисуем текст "SD" и "Steam Deck" поверх затемнения
         if self.alpha > 0:
@@ -81,6 +84,13 @@ class XMBStartup:
             steam_text.set_alpha(self.alpha)
             self.xmb.screen.blit(steam_text, steam_rect)
     
+    def skip(self):
+        """Немедленный переход к основному меню без вступительной анимации"""
+        self.phase = "main_menu"
+        self.alpha = 0
+        self.main_menu_alpha = 255
+        self.xmb.main_menu_alpha = 255
+    
     def is_active(self):
         """Проверяет, активна ли вступительная анимация"""
         return self.phase != "main_menu"
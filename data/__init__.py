@@ -1,5 +1,6 @@
 # data/__init__.py
 
-from .menu_data import get_categories_with_subs, get_subcategories_data, get_options_data
+from .menu_data import get_categories_with_subs, get_subcategories_data, get_options_data, load_menu_data
+from .menu_store import MenuStore
 
-__all__ = ['get_categories_with_subs', 'get_subcategories_data', 'get_options_data']
\ No newline at end of file
+__all__ = ['get_categories_with_subs', 'get_subcategories_data', 'get_options_data', 'load_menu_data', 'MenuStore']
\ No newline at end of file
@@ -1,14 +1,30 @@
 # data/menu_data.py
 import json
 import os
-from config import BUILTIN_CATEGORIES, BUILTIN_SUBCATEGORIES
+import sys
+import marshal
+import hashlib
+import sqlite3
+from config import BUILTIN_CATEGORIES, BUILTIN_SUBCATEGORIES, CACHE_DIR, MENU_SNAPSHOT, MENU_STORE, MENU_STORE_FILE
+from data.menu_store import MenuStore
+
+DATA_DIR = os.path.dirname(__file__)
+MENU_SOURCE_FILES = ("categories.json", "subcategories.json", "options.json")
+MENU_SNAPSHOT_PATH = os.path.join(os.path.dirname(DATA_DIR), CACHE_DIR, "menu_snapshot.bin")
+MENU_STORE_PATH = os.path.join(DATA_DIR, MENU_STORE_FILE)
+
+# Версия формата снимка - увеличивать при изменении структуры данных меню
+MENU_SNAPSHOT_VERSION = 2
+
+# Ошибки чтения JSON при последней загрузке: с ними снимок не записывается
+load_errors = []
 
 def load_categories():
     """Загрузка категорий - встроенные + кастомные из JSON"""
     builtin_categories = BUILTIN_CATEGORIES.copy()
     
     # Загрузка кастомных категорий из JSON
-    config_path = os.path.join(os.path.dirname(__file__), 'categories.json')
+    config_path = os.path.join(DATA_DIR, 'categories.json')
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             custom_categories = json.load(f)
@@ -24,6 +40,7 @@ def load_categories():
         return builtin_categories
     except json.JSONDecodeError as e:
         print(f"Error parsing categories.json: {e}, using built-in categories only")
+        load_errors.append("categories.json")
         return builtin_categories
 
 def load_subcategories():
@@ -31,7 +48,7 @@ def load_subcategories():
     all_subcategories = BUILTIN_SUBCATEGORIES.copy()
     
     # Загрузка кастомных подкатегорий из JSON
-    config_path = os.path.join(os.path.dirname(__file__), 'subcategories.json')
+    config_path = os.path.join(DATA_DIR, 'subcategories.json')
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             custom_subcategories = json.load(f)
@@ -45,12 +62,13 @@ def load_subcategories():
         print("No custom subcategories.json found, using built-in subcategories only")
     except json.JSONDecodeError as e:
         print(f"Error parsing subcategories.json: {e}, using built-in subcategories only")
+        load_errors.append("subcategories.json")
     
     return all_subcategories
 
 def load_options():
     """Загрузка опций из JSON файла с группировкой по подкатегориям"""
-    config_path = os.path.join(os.path.dirname(__file__), 'options.json')
+    config_path = os.path.join(DATA_DIR, 'options.json')
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
@@ -69,11 +87,42 @@ def load_options():
             
     except FileNotFoundError:
         print(f"Warning: options.json not found, using default data")
+        load_errors.append("options.json")
         return get_options_fallback()
     except json.JSONDecodeError as e:
         print(f"Error parsing options.json: {e}, using default data")
+        load_errors.append("options.json")
         return get_options_fallback()
 
+def load_store_counts():
+    """Количество опций по подкатегориям в хранилище SQLite (только чтение).
+    Сами опции интерфейс читает страницами при показе"""
+    if not MENU_STORE:
+        return {}
+    if not os.path.exists(MENU_STORE_PATH):
+        print(f"No {MENU_STORE_FILE} found, options are loaded from options.json only")
+        return {}
+    
+    try:
+        with MenuStore(MENU_STORE_PATH, readonly=True) as store:
+            counts = store.get_subcategory_counts()
+            print(f"Found {sum(counts.values())} options for {len(counts)} subcategories in {MENU_STORE_FILE}")
+            return counts
+    except sqlite3.Error as e:
+        print(f"Error reading {MENU_STORE_FILE}: {e}, using options.json only")
+        load_errors.append(MENU_STORE_FILE)
+        return {}
+
+def apply_store_counts(subcategories_data, options_data, options_by_subcategory, counts):
+    """Подкатегории с опциями в хранилище получают их количество (stored_options);
+    опции этих подкатегорий из options.json не используются"""
+    for subcategory, count in counts.items():
+        if subcategory not in subcategories_data:
+            continue
+        subcategories_data[subcategory] = dict(subcategories_data[subcategory], stored_options=count)
+        for option_name in options_by_subcategory.pop(subcategory, []):
+            options_data.pop(option_name, None)
+
 def build_category_structure(categories_data, subcategories_data):
     """Построение структуры категорий с подкатегориями"""
     result_categories = []
@@ -98,6 +147,72 @@ def build_category_structure(categories_data, subcategories_data):
     
     return result_categories
 
+# Снимок меню
+def get_menu_snapshot_key():
+    """Ключ снимка: версии формата и Python, источник опций, время изменения и размер
+    каждого JSON (и хранилища SQLite),
+    хэш встроенных категорий и подкатегорий из config.py"""
+    sources = []
+    for name in MENU_SOURCE_FILES + ((MENU_STORE_FILE,) if MENU_STORE else ()):
+        try:
+            stat = os.stat(os.path.join(DATA_DIR, name))
+            sources.append((name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            sources.append((name, None, None))
+    
+    builtins = repr((BUILTIN_CATEGORIES, BUILTIN_SUBCATEGORIES)).encode("utf-8")
+    return (MENU_SNAPSHOT_VERSION, tuple(sys.version_info[:2]), MENU_STORE, tuple(sources), hashlib.sha1(builtins).hexdigest())
+
+def read_menu_snapshot(key):
+    """Данные меню из снимка одним чтением; None если снимка нет или он устарел"""
+    try:
+        with open(MENU_SNAPSHOT_PATH, "rb") as f:
+            snapshot_key, menu = marshal.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        print(f"Warning: Menu snapshot is unusable, reloading JSON: {e}")
+        return None
+    
+    if snapshot_key != key:
+        return None
+    return menu
+
+def write_menu_snapshot(key, menu):
+    """Запись снимка; ошибки записи не мешают запуску"""
+    try:
+        os.makedirs(os.path.dirname(MENU_SNAPSHOT_PATH), exist_ok=True)
+        tmp_path = MENU_SNAPSHOT_PATH + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(marshal.dumps((key, menu)))
+        os.replace(tmp_path, MENU_SNAPSHOT_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Cannot write menu snapshot: {e}")
+
+def load_menu_data():
+    """Все данные меню: (категории с подкатегориями, подкатегории, опции, опции по подкатегориям).
+    Если JSON и встроенные данные не менялись - из снимка, иначе разбор JSON и новый снимок"""
+    del load_errors[:]
+    key = get_menu_snapshot_key() if MENU_SNAPSHOT else None
+    if key is not None:
+        menu = read_menu_snapshot(key)
+        if menu is not None:
+            categories_data, subcategories_data, options_data, options_by_subcategory = menu
+            print(f"Loaded menu snapshot: {len(categories_data)} categories, {len(subcategories_data)} subcategories, {len(options_data)} options")
+            return menu
+    
+    # Каждый файл читается один раз
+    subcategories_data = load_subcategories()
+    categories_data = build_category_structure(load_categories(), subcategories_data)
+    options_data, options_by_subcategory = load_options()
+    apply_store_counts(subcategories_data, options_data, options_by_subcategory, load_store_counts())
+    menu = (categories_data, subcategories_data, options_data, options_by_subcategory)
+    
+    # Снимок только успешной загрузки: ошибка в JSON должна показываться при каждом запуске
+    if key is not None and not load_errors:
+        write_menu_snapshot(key, menu)
+    return menu
+
 # Основные функции загрузки
 def get_categories_with_subs():
     """Основная функция для получения категорий с подкатегориями"""
@@ -0,0 +1,145 @@
+# data/menu_store.py
+import os
+import json
+import sqlite3
+from pathlib import Path
+
+# Версия схемы - увеличивать при изменении таблиц
+MENU_STORE_SCHEMA_VERSION = 1
+
+MENU_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS options (
+    name TEXT PRIMARY KEY,
+    subcategory TEXT NOT NULL,
+    sort_name TEXT NOT NULL,
+    icon TEXT,
+    command TEXT
+);
+CREATE INDEX IF NOT EXISTS options_by_subcategory ON options (subcategory, sort_name, name);
+CREATE INDEX IF NOT EXISTS options_by_sort_name ON options (sort_name);
+"""
+
+def get_sort_name(name):
+    """Ключ сортировки опции - как у сканера Steam (без учета регистра)"""
+    return name.lower()
+
+class MenuStore:
+    """Хранилище опций меню в SQLite для больших библиотек.
+    Опции подкатегории читаются страницами по индексу (subcategory, sort_name),
+    запись - одной транзакцией. Интерфейс открывает хранилище только для чтения
+    (readonly=True); создают и пишут его сканеры и scripts/import_menu_store.py"""
+    
+    def __init__(self, path, readonly=False):
+        self.path = path
+        
+        if readonly:
+            # Чтение не создает файл, не трогает схему и ничего не пишет -
+            # слежение за data/ не видит в нем изменений
+            self.connection = sqlite3.connect(Path(os.path.abspath(path)).as_uri() + "?mode=ro", uri=True)
+            return
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # Журнал отката (не WAL): после записи меняется сам файл базы,
+        # и слежение за data/ в интерфейсе замечает изменение
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(MENU_STORE_SCHEMA)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(MENU_STORE_SCHEMA_VERSION),)
+            )
+    
+    def close(self):
+        """Закрытие соединения"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    # Чтение
+    def get_subcategory_counts(self):
+        """Количество опций по подкатегориям"""
+        return dict(self.connection.execute(
+            "SELECT subcategory, COUNT(*) FROM options GROUP BY subcategory"
+        ))
+    
+    def get_page(self, subcategory, offset, limit):
+        """Страница опций подкатегории в порядке sort_name: [(имя, данные)].
+        Читаются только строки страницы"""
+        rows = self.connection.execute(
+            "SELECT name, icon, command FROM options "
+            "WHERE subcategory = ? ORDER BY sort_name, name LIMIT ? OFFSET ?",
+            (subcategory, limit, offset)
+        )
+        return [(name, self._to_option(subcategory, icon, command)) for name, icon, command in rows]
+    
+    def get_position(self, subcategory, name):
+        """Индекс опции в подкатегории (в порядке get_page) или None, если ее там нет"""
+        row = self.connection.execute(
+            "SELECT sort_name FROM options WHERE name = ? AND subcategory = ?", (name, subcategory)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM options WHERE subcategory = ? AND (sort_name < ? OR (sort_name = ? AND name < ?))",
+            (subcategory, row[0], row[0], name)
+        ).fetchone()[0]
+    
+    def _to_option(self, subcategory, icon, command):
+        """Строка таблицы -> данные опции как в options.json"""
+        option = {"subcategory": subcategory}
+        if icon is not None:
+            option["icon"] = icon
+        if command is not None:
+            option["command"] = command
+        return option
+    
+    # Запись
+    def _insert_options(self, options_data):
+        """Вставка или замена опций {имя: данные}; опции без подкатегории пропускаются"""
+        rows = [
+            (name, data["subcategory"], get_sort_name(name), data.get("icon"), data.get("command"))
+            for name, data in options_data.items() if data.get("subcategory")
+        ]
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO options (name, subcategory, sort_name, icon, command) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(rows)
+    
+    def replace_subcategory(self, subcategory, options_data):
+        """Замена всех опций подкатегории одной транзакцией (для сканеров):
+        запущенный интерфейс видит либо старый, либо новый список целиком"""
+        with self.connection:
+            self.connection.execute("DELETE FROM options WHERE subcategory = ?", (subcategory,))
+            return self._insert_options(
+                {name: dict(data, subcategory=subcategory) for name, data in options_data.items()}
+            )
+    
+    def import_json(self, options_file, subcategories=None):
+        """Импорт options.json одной транзакцией: опции из файла добавляются или заменяют
+        одноименные, остальные опции хранилища не трогаются. subcategories - импортировать
+        только эти подкатегории"""
+        with open(options_file, 'r', encoding='utf-8') as f:
+            options_data = json.load(f)
+        
+        if subcategories is not None:
+            options_data = {
+                name: data for name, data in options_data.items() if data.get("subcategory") in subcategories
+            }
+        
+        with self.connection:
+            return self._insert_options(options_data)
\ No newline at end of file
@@ -1,11 +1,31 @@
 # main.py
+import time
+STARTUP_TIME = time.perf_counter()
+
+import argparse
 import pygame
 import sys
 from core.xmb_interface import XMBInterface  # Измененный импорт
+from core.xmb_profiling import StartupTimer
+IMPORTS_DONE = time.perf_counter()
 
 def main():
+    parser = argparse.ArgumentParser(description="XMB Interface")
+    parser.add_argument("--debug-startup", action="store_true", help="печать времени этапов запуска до первого кадра")
+    args = parser.parse_args()
+    
+    # Отчет о времени запуска: импорты, окно, данные, иконки, шрифты, первый кадр
+    startup_timer = None
+    if args.debug_startup:
+        startup_timer = StartupTimer(STARTUP_TIME)
+        startup_timer.measure("imports", STARTUP_TIME, IMPORTS_DONE)
+    
+    phase_start = time.perf_counter()
     pygame.init()
-    app = XMBInterface()
+    if startup_timer is not None:
+        startup_timer.measure("pygame init", phase_start)
+    
+    app = XMBInterface(startup_timer)
     app.run()
 
 if __name__ == "__main__":
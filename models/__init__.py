@@ -4,5 +4,6 @@
 from .xmb_item import XMBItem
 from .xmb_subcategory import XMBSubcategory
 from .xmb_option import XMBOption
+from .xmb_option_pages import PagedOptionList
 
-__all__ = ['XMBItem', 'XMBSubcategory', 'XMBOption']
\ No newline at end of file
+__all__ = ['XMBItem', 'XMBSubcategory', 'XMBOption', 'PagedOptionList']
\ No newline at end of file
@@ -0,0 +1,84 @@
+# models/xmb_option_pages.py
+from collections import OrderedDict
+from models.xmb_option import XMBOption
+
+class PagedOptionList:
+    """Список опций подкатегории из хранилища SQLite. Ведет себя как список XMBOption
+    (len и индекс), но объекты создаются страницами только при обращении - на экране
+    окно опций, поэтому в памяти несколько страниц, а не вся библиотека"""
+    
+    def __init__(self, store, subcategory, count, page_size, max_pages, on_load=None, on_evict=None, reuse=None):
+        self.store = store
+        self.subcategory = subcategory
+        self.count = count
+        self.page_size = page_size
+        self.max_pages = max_pages
+        
+        # on_load({имя: данные}) - новая страница (например, регистрация иконок),
+        # on_evict([имена]) - страница выгружена
+        self.on_load = on_load
+        self.on_evict = on_evict
+        
+        # Объекты прежнего списка по именам (после перезагрузки меню) - сохраняют позиции
+        self.reuse = reuse or {}
+        
+        # Номер страницы -> список XMBOption; давно не использованные выгружаются
+        self.pages = OrderedDict()
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("option index out of range")
+        
+        page_index, offset = divmod(index, self.page_size)
+        page = self.pages.get(page_index)
+        if page is None:
+            page = self._load_page(page_index)
+        else:
+            self.pages.move_to_end(page_index)
+        return page[offset]
+    
+    def _load_page(self, page_index):
+        """Чтение страницы из хранилища и создание ее объектов"""
+        rows = self.store.get_page(self.subcategory, page_index * self.page_size, self.page_size)
+        
+        page = []
+        for name, data in rows:
+            option = self.reuse.pop(name, None)
+            if option is None:
+                option = XMBOption(name=name, icon=data.get("icon"), command=data.get("command"))
+            else:
+                option.icon_name = data.get("icon")
+                option.command = data.get("command")
+            page.append(option)
+        
+        # Хранилище изменилось после подсчета опций - до перезагрузки меню
+        # (ее вызовет слежение за data/) недостающие строки остаются пустыми
+        expected = min(self.page_size, self.count - page_index * self.page_size)
+        while len(page) < expected:
+            page.append(XMBOption(name=""))
+        
+        if self.on_load is not None:
+            self.on_load(dict(rows))
+        
+        self.pages[page_index] = page
+        while len(self.pages) > self.max_pages:
+            evicted_index, evicted = self.pages.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict([option.name for option in evicted if option.name])
+        return page
+    
+    def index_of(self, name):
+        """Индекс опции по имени (ValueError, если ее нет) - запросом к хранилищу, без загрузки страниц"""
+        position = self.store.get_position(self.subcategory, name)
+        if position is None or position >= self.count:
+            raise ValueError(f"{name!r} is not in {self.subcategory}")
+        return position
+    
+    def get_loaded(self):
+        """Уже созданные объекты опций"""
+        return [option for page in self.pages.values() for option in page if option.name]
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк расчета позиций опций: стоимость кадра не должна зависеть от длины списка
+Использование: python scripts/benchmark_layout.py [--frames N] [--sizes 10,100,1000,10000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Добавляем путь к корневой директории проекта для импорта модулей
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import NAV_LEVEL_OPTIONS, SUBCATEGORY_SELECTION_Y
+from core.xmb_animations import XMBAnimations
+from models.xmb_item import XMBItem
+from models.xmb_option import XMBOption
+from ui.animation_manager import AnimationManager
+
+SUBCATEGORY_NAME = "Benchmark List"
+
+def create_fake_interface(option_count):
+    """Минимальный объект интерфейса с одним списком опций заданной длины"""
+    category = XMBItem("Game", subcategories=[SUBCATEGORY_NAME])
+    options = [XMBOption(f"Game {i}") for i in range(option_count)]
+    
+    return SimpleNamespace(
+        categories=[category],
+        subcategory_objects={},
+        option_objects={SUBCATEGORY_NAME: options},
+        current_category_index=0,
+        current_subcategory_index=0,
+        current_option_index=0,
+        navigation_level=NAV_LEVEL_OPTIONS,
+        subcategory_selection_y=SUBCATEGORY_SELECTION_Y,
+        animation_manager=AnimationManager(),
+    )
+
+def benchmark_size(option_count, frames):
+    """Среднее время обновления позиций за кадр (мкс) при постоянной прокрутке"""
+    xmb = create_fake_interface(option_count)
+    animations = XMBAnimations(xmb)
+    animations.update_option_positions(initial=True)
+    
+    start = time.perf_counter()
+    for frame in range(frames):
+        # Каждые 10 кадров сдвигаем выбор, как при удержании кнопки
+        if frame % 10 == 0:
+            xmb.current_option_index = (xmb.current_option_index + 1) % option_count
+        animations.update_option_positions()
+    elapsed = time.perf_counter() - start
+    
+    return elapsed / frames * 1_000_000, animations.layout.recalculations
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="XMB layout benchmark")
+    parser.add_argument("--frames", type=int, default=2000, help="кадров на каждый размер списка")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="размеры списков через запятую")
+    args = parser.parse_args()
+    
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    
+    print("XMB Layout Benchmark")
+    print("=" * 50)
+    print(f"{'options':>10} {'us/frame':>12} {'recalcs':>10}")
+    
+    results = []
+    for size in sizes:
+        per_frame, recalculations = benchmark_size(size, args.frames)
+        results.append(per_frame)
+        print(f"{size:>10} {per_frame:>12.2f} {recalculations:>10}")
+    
+    if len(results) > 1 and results[0] > 0:
+        print(f"\nCost ratio largest/smallest: {results[-1] / results[0]:.2f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Headless-бенчмарк отрисовки XMB интерфейса со скриптовой навигацией
+Работает без дисплея и GPU (SDL dummy), вступительная анимация пропускается.
+Использование: python scripts/benchmark_renderer.py [--subcategories N] [--options N] [--frames N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Драйверы SDL должны быть выбраны до импорта pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Добавляем путь к корневой директории проекта для импорта модулей
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pygame
+
+# Сценарий по умолчанию: вход в список игр, прокрутка вниз и вверх (с переходом через начало), смена категорий
+DEFAULT_SCRIPT = "RETURN DOWN*40 UP*15 UP*30 LEFT UP RIGHT LEFT DOWN"
+
+KEY_NAMES = {
+    "UP": pygame.K_UP,
+    "DOWN": pygame.K_DOWN,
+    "LEFT": pygame.K_LEFT,
+    "RIGHT": pygame.K_RIGHT,
+    "RETURN": pygame.K_RETURN,
+    "ESCAPE": pygame.K_ESCAPE,
+}
+
+def parse_script(script):
+    """Разбор сценария вида "DOWN*10 RETURN" в список клавиш"""
+    keys = []
+    for token in script.split():
+        name, _, count = token.partition("*")
+        if name.upper() not in KEY_NAMES:
+            raise ValueError(f"Unknown key in script: {name}")
+        keys.extend([KEY_NAMES[name.upper()]] * int(count or 1))
+    return keys
+
+def build_synthetic_menu(subcategory_count, option_count, icon_name):
+    """Синтетическое меню: встроенные категории + N списков по M опций в категории Game"""
+    from config import BUILTIN_SUBCATEGORIES
+    from data.menu_data import load_categories, build_category_structure
+    
+    subcategories_data = BUILTIN_SUBCATEGORIES.copy()
+    options_data = {}
+    options_by_subcategory = {}
+    
+    for s in range(subcategory_count):
+        subcategory_name = f"Benchmark List {s + 1}"
+        subcategories_data[subcategory_name] = {"category": "Game", "icon": "folder.png", "type": 1}
+        
+        option_names = []
+        for o in range(option_count):
+            option_name = f"Benchmark Game {s + 1}-{o + 1}"
+            options_data[option_name] = {"subcategory": subcategory_name, "icon": icon_name, "command": ""}
+            option_names.append(option_name)
+        options_by_subcategory[subcategory_name] = option_names
+    
+    categories_data = build_category_structure(load_categories(), subcategories_data)
+    return categories_data, subcategories_data, options_data, options_by_subcategory
+
+def run_benchmark(args):
+    """Прогон сценария и сбор покадровой статистики"""
+    from core.xmb_interface import XMBInterface
+    from core.xmb_profiling import FrameProfiler
+    
+    pygame.init()
+    app = XMBInterface()
+    app.boot.wait()
+    app.startup.skip()
+    
+    if args.options > 0:
+        app.load_menu(*build_synthetic_menu(args.subcategories, args.options, args.icon))
+    
+    # Иконки грузятся в фоне - замеры идут уже с настоящими иконками
+    load_start = time.perf_counter()
+    while app.icon_manager.is_loading():
+        app.icon_manager.poll()
+        time.sleep(0.002)
+    print(f"Icons ready in {(time.perf_counter() - load_start) * 1000:.0f} ms")
+    
+    # Переходим в категорию Game, где лежат синтетические списки
+    game_index = next((i for i, c in enumerate(app.categories) if c.name == "Game"), app.current_category_index)
+    app.current_category_index = game_index
+    app.previous_category_index = game_index
+    app.current_subcategory_index = len(app.categories[game_index].subcategories) - 1 if args.options > 0 else 0
+    app.update_subcategory_positions(initial=True)
+    
+    # Фиксированный шаг анимаций: сценарий воспроизводится одинаково при любой скорости машины
+    app.animation_manager.fixed_dt = 1.0 / 60
+    
+    profiler = FrameProfiler()
+    app.renderer.profiler = profiler
+    
+    keys = parse_script(args.script)
+    total_frames = args.warmup + max(args.frames, len(keys) * args.interval)
+    
+    for frame in range(total_frames):
+        if frame == args.warmup:
+            profiler.reset()
+        
+        # Нажатия клавиш идут через обычную обработку событий навигации
+        step = frame - args.warmup
+        if step >= 0 and step % args.interval == 0 and step // args.interval < len(keys):
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=keys[step // args.interval]))
+        
+        frame_start = time.perf_counter()
+        if not app.navigation.handle_events():
+            break
+        app.draw()
+        profiler.add_sample("frame", (time.perf_counter() - frame_start) * 1000)
+    
+    return app, profiler
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Headless XMB renderer benchmark")
+    parser.add_argument("--subcategories", type=int, default=1, help="синтетических списков в категории Game")
+    parser.add_argument("--options", type=int, default=1500, help="опций в каждом списке (0 - реальные данные меню)")
+    parser.add_argument("--icon", default="game_blank.png", help="иконка синтетических опций")
+    parser.add_argument("--frames", type=int, default=600, help="минимальное количество замеряемых кадров")
+    parser.add_argument("--warmup", type=int, default=30, help="кадров прогрева без замеров")
+    parser.add_argument("--interval", type=int, default=6, help="кадров между нажатиями клавиш")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="сценарий навигации, например \"DOWN*10 RETURN\"")
+    args = parser.parse_args()
+    
+    app, profiler = run_benchmark(args)
+    
+    print("\nXMB Renderer Benchmark")
+    print("=" * 66)
+    print(f"Menu: {args.subcategories} list(s) x {args.options} options, driver: {os.environ['SDL_VIDEODRIVER']}")
+    print(f"{'stage':<15} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'frames':>8}")
+    for stage, row in profiler.get_report().items():
+        print(f"{stage:<15} {row['p50']:>9.3f} {row['p90']:>9.3f} {row['p99']:>9.3f} {row['max']:>9.3f} {row['frames']:>8}")
+    
+    print("\nCaches:")
+    print(f"  labels:  {app.label_cache.get_stats()}")
+    print(f"  sprites: {app.sprite_cache.get_stats()}")
+    print(f"  icons:   {app.icon_manager.get_memory_stats()}")
+    print(f"  layers:  {app.layers.get_stats()}")
+    print(f"  video:   {app.background.get_stats()}")
+    
+    app.background.stop()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
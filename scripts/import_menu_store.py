@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Импорт опций из options.json в хранилище SQLite (data/menu.db)
+Подкатегории, попавшие в хранилище, интерфейс читает из него (при MENU_STORE = True).
+Использование: python scripts/import_menu_store.py [--subcategory NAME ...] [--options FILE]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Добавляем путь к корневой директории проекта для импорта модулей
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import MENU_STORE, MENU_STORE_FILE
+from data.menu_store import MenuStore
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Import options.json into the XMB SQLite menu store")
+    parser.add_argument("--options", default=str(project_root / "data" / "options.json"), help="файл опций для импорта")
+    parser.add_argument("--subcategory", action="append", help="импортировать только эту подкатегорию (можно несколько раз)")
+    args = parser.parse_args()
+    
+    store_file = project_root / "data" / MENU_STORE_FILE
+    with MenuStore(str(store_file)) as store:
+        imported = store.import_json(args.options, args.subcategory)
+        counts = store.get_subcategory_counts()
+    
+    print(f"Imported {imported} options into {store_file}")
+    for subcategory, count in sorted(counts.items()):
+        print(f"   {subcategory}: {count}")
+    
+    if not MENU_STORE:
+        print("Note: MENU_STORE is disabled in config.py, the interface still reads options.json")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
\ No newline at end of file
@@ -21,6 +21,8 @@ except ImportError:
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from config import MENU_STORE, MENU_STORE_FILE
+
 def get_steam_library_paths():
     """Получение путей к библиотекам Steam"""
     steam_paths = []
@@ -233,8 +235,17 @@ def create_game_command(game):
     # Просто возвращаем Steam URI, а XMB интерфейс сам разберется как его открыть
     return f'steam://rungameid/{appid}'
 
+def write_json_atomic(path, data):
+    """Запись JSON через временный файл: запущенный интерфейс следит за data/*.json
+    и не должен увидеть наполовину записанный файл"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
 def clean_existing_games():
-    """Очистка существующих игр из конфигурации"""
+    """Очистка существующих игр из конфигурации (в режиме хранилища игры
+    живут только в нем, старые записи из options.json тоже удаляются)"""
     data_dir = project_root / 'data'
     options_file = data_dir / 'options.json'
     
@@ -256,13 +267,37 @@ def clean_existing_games():
         print(f"Removed existing game: {game_name}")
     
     # Сохраняем очищенные options
-    with open(options_file, 'w', encoding='utf-8') as f:
-        json.dump(options_data, f, indent=2, ensure_ascii=False)
+    write_json_atomic(options_file, options_data)
     
     return len(games_to_remove)
 
+def update_store_config(games):
+    """Замена списка игр в хранилище SQLite одной транзакцией"""
+    from data.menu_store import MenuStore
+    
+    store_file = project_root / 'data' / MENU_STORE_FILE
+    games_data = {
+        game['name']: {"icon": "game_blank.png", "command": create_game_command(game)}
+        for game in games
+    }
+    
+    try:
+        with MenuStore(str(store_file)) as store:
+            added = store.replace_subcategory("Steam Game List", games_data)
+        
+        print(f"\nSuccessfully updated {MENU_STORE_FILE}!")
+        print(f"Added {added} unique games to Steam Game List")
+        return True
+    
+    except Exception as e:
+        print(f"Error saving configuration: {e}")
+        return False
+
 def update_xmb_config(games):
     """Обновление конфигурационных файлов XMB с играми в новой структуре"""
+    if MENU_STORE:
+        return update_store_config(games)
+    
     data_dir = project_root / 'data'
     options_file = data_dir / 'options.json'
     
@@ -287,8 +322,7 @@ def update_xmb_config(games):
     
     # Сохраняем обновленные конфиги
     try:
-        with open(options_file, 'w', encoding='utf-8') as f:
-            json.dump(options_data, f, indent=2, ensure_ascii=False)
+        write_json_atomic(options_file, options_data)
         
         print(f"\nSuccessfully updated configuration!")
         print(f"Added {len(games)} unique games to Steam Game List")
@@ -319,8 +353,7 @@ def ensure_game_list_subcategory():
         print("Added 'Steam Game List' subcategory to subcategories.json")
         
         # Сохраняем обновленный файл
-        with open(subcategories_file, 'w', encoding='utf-8') as f:
-            json.dump(subcategories_data, f, indent=2, ensure_ascii=False)
+        write_json_atomic(subcategories_file, subcategories_data)
     
     return True
 
@@ -386,7 +419,7 @@ def main():
     
     if success:
         print("\n✅ Update completed successfully!")
-        print("   Restart XMB Interface to see the changes.")
+        print("   A running XMB Interface picks up the changes automatically.")
         print("   Games are now in: Game → Steam Game List")
     else:
         print("\n❌ Update failed!")
@@ -3,5 +3,7 @@
 from .animation_manager import AnimationManager
 from .icon_manager import IconManager
 from .sound_manager import SoundManager
+from .label_cache import LabelCache
+from .sprite_cache import SpriteAlphaCache
 
-__all__ = ['AnimationManager', 'IconManager', 'SoundManager']
\ No newline at end of file
+__all__ = ['AnimationManager', 'IconManager', 'SoundManager', 'LabelCache', 'SpriteAlphaCache']
\ No newline at end of file
@@ -1,5 +1,6 @@
 # ui/animation_manager.py
 import math
+import time
 import pygame
 from config import *
 
@@ -7,23 +8,55 @@ class AnimationManager:
     def __init__(self):
         self.pulse_time = 0
         
+        # Время кадра: все анимации считаются от реально прошедшего времени
+        self.last_frame_time = None
+        self.frame_dt = 1.0 / ANIMATION_REFERENCE_FPS
+        
+        # Фиксированный шаг времени вместо измеренного (для бенчмарков и воспроизводимых прогонов)
+        self.fixed_dt = None
+        self._update_smoothing()
+    
+    def begin_frame(self, dt=None):
+        """Начало кадра: фиксирует прошедшее время (dt в секундах; None - измерить)"""
+        now = time.perf_counter()
+        if dt is None:
+            dt = self.fixed_dt
+        if dt is None:
+            if self.last_frame_time is None:
+                dt = 1.0 / ANIMATION_REFERENCE_FPS
+            else:
+                dt = now - self.last_frame_time
+        self.last_frame_time = now
+        
+        # Ограничиваем шаг, чтобы после долгой паузы анимации не "перепрыгивали"
+        self.frame_dt = min(max(dt, 0.0), ANIMATION_MAX_FRAME_TIME)
+        self._update_smoothing()
+    
+    def _update_smoothing(self):
+        """Коэффициенты экспоненциального сглаживания для текущего времени кадра.
+        Скорости из config заданы на один кадр при ANIMATION_REFERENCE_FPS"""
+        frames = self.frame_dt * ANIMATION_REFERENCE_FPS
+        self.position_factor = 1.0 - (1.0 - ANIMATION_SPEED) ** frames
+        self.alpha_factor = 1.0 - (1.0 - FADE_SPEED) ** frames
+        self.offset_factor = 1.0 - (1.0 - OFFSET_SPEED) ** frames
+    
     def update_pulse(self):
         """Обновление времени для пульсации"""
-        self.pulse_time += PULSE_SPEED
+        self.pulse_time += PULSE_SPEED * self.frame_dt * ANIMATION_REFERENCE_FPS
         if self.pulse_time > 1.0:
-            self.pulse_time = 0.0
+            self.pulse_time %= 1.0
     
     def lerp_position(self, current, target):
-        """Линейная интерполяция для плавной анимации позиции"""
-        return current + (target - current) * ANIMATION_SPEED
+        """Экспоненциальное сглаживание позиции (не зависит от частоты кадров)"""
+        return current + (target - current) * self.position_factor
     
     def lerp_alpha(self, current, target):
-        """Линейная интерполяция для альфа-канала"""
-        return current + (target - current) * FADE_SPEED
+        """Экспоненциальное сглаживание альфа-канала"""
+        return current + (target - current) * self.alpha_factor
     
     def lerp_offset(self, current, target):
-        """Линейная интерполяция для смещения интерфейса"""
-        return current + (target - current) * OFFSET_SPEED
+        """Экспоненциальное сглаживание смещения интерфейса"""
+        return current + (target - current) * self.offset_factor
     
     def get_pulse_factor(self):
         """Получение коэффициента пульсации (от 0.5 до 1.0)"""
@@ -0,0 +1,87 @@
+# ui/icon_disk_cache.py
+import os
+import struct
+import hashlib
+import threading
+import pygame
+from config import *
+
+# Заголовок записи: сигнатура, ширина, высота; дальше сырые пиксели RGBA
+ICON_CACHE_HEADER = struct.Struct("<4sHH")
+ICON_CACHE_MAGIC = b"XMBI"
+
+class IconDiskCache:
+    """Кэш готовых (отмасштабированных и отцентрированных) иконок на диске.
+    Запись - один файл, читается одним read без декодирования PNG и smoothscale.
+    Методы вызываются из потоков загрузки иконок"""
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.directory_ready = False
+        
+        # Статистика попаданий за запуск
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _entry_path(self, filepath, icon_size):
+        """Путь записи: ключ из файла (путь, время изменения, размер), размера иконки и масштаба"""
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{stat.st_mtime_ns}|{stat.st_size}|{icon_size[0]}x{icon_size[1]}|{SCALE_FACTOR}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}.rgba")
+    
+    def load(self, filepath, icon_size):
+        """Готовая иконка из кэша или None (поверхность не приведена к формату экрана)"""
+        surface = None
+        try:
+            with open(self._entry_path(filepath, icon_size), "rb") as f:
+                data = f.read()
+            
+            magic, width, height = ICON_CACHE_HEADER.unpack_from(data)
+            if magic == ICON_CACHE_MAGIC and (width, height) == tuple(icon_size) and len(data) == ICON_CACHE_HEADER.size + width * height * 4:
+                surface = pygame.image.frombuffer(memoryview(data)[ICON_CACHE_HEADER.size:], (width, height), "RGBA")
+        except (OSError, struct.error, ValueError):
+            surface = None
+        
+        with self.lock:
+            if surface is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return surface
+    
+    def save(self, filepath, icon_size, surface):
+        """Запись иконки; ошибки записи не мешают работе (кэш просто не пополнится)"""
+        try:
+            if not self.directory_ready:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self.directory_ready = True
+            
+            path = self._entry_path(filepath, icon_size)
+            width, height = surface.get_size()
+            data = ICON_CACHE_HEADER.pack(ICON_CACHE_MAGIC, width, height) + pygame.image.tobytes(surface, "RGBA")
+            
+            # Временный файл на поток: одну иконку могут записывать несколько потоков сразу
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Cannot write icon cache entry for {os.path.basename(filepath)}: {e}")
+    
+    def reset_stats(self):
+        """Сброс статистики перед новым набором иконок"""
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+    
+    def get_stats(self):
+        """Статистика кэша"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
\ No newline at end of file
@@ -1,58 +1,343 @@
 # ui/icon_manager.py
 import pygame
 import os
+import queue
+import threading
+import itertools
+import time
 from config import *
+from ui.icon_disk_cache import IconDiskCache
+
+# Приоритеты фоновой загрузки (меньше - раньше)
+PRIORITY_SELECTED = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_CATEGORY = 2
+PRIORITY_SUBCATEGORY = 3
+PRIORITY_OPTION = 4
 
 class IconManager:
-    def __init__(self):
+    def __init__(self, threads=ICON_LOADER_THREADS):
         self.icons = {}
         self.option_icon = None
         self.glow_surfaces = {}
         
+        # Фоновая загрузка: очередь заданий с приоритетами и готовые иконки для главного потока
+        self.threads = threads
+        self.workers = []
+        self.jobs = queue.PriorityQueue()
+        self.results = queue.Queue()
+        self.order = itertools.count()
+        self.lock = threading.Lock()
+        
+        # Иконки дедуплицируются по источнику - (файл, размер): одинаковые иконки
+        # (например, game_blank.png у всех игр Steam) грузятся один раз и делят поверхность.
+        # Источник -> имена, имя -> источник, источник -> приоритет еще не взятого задания,
+        # источник -> загруженная поверхность (None - файл не загрузился)
+        self.source_names = {}
+        self.name_sources = {}
+        self.pending = {}
+        self.source_surfaces = {}
+        self.in_flight = 0
+        
+        # Поколение набора иконок: результаты прошлого load_icons отбрасываются
+        self.generation = 0
+        
+        # Длительность последней загрузки набора иконок, мс (None - еще грузятся)
+        self.load_start = 0.0
+        self.load_time = None
+        
+        # Заглушки: общий фон на каждый размер (он же показывается, пока иконка грузится)
+        # и шрифты для буквы имени
+        self.placeholder_bases = {}
+        self.placeholder_fonts = {}
+        
+        # Кэш готовых иконок на диске
+        self.disk_cache = None
+        if ICON_DISK_CACHE:
+            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            self.disk_cache = IconDiskCache(os.path.join(project_root, CACHE_DIR, "icons"))
+    
     def load_icons(self, categories_data, subcategories_data, options_data, resources_dir):
-        """Загрузка иконок из конфигурационных данных"""
+        """Регистрация иконок из конфигурационных данных. Сразу возвращает словарь
+        с заглушками; настоящие иконки подставляются в него же через poll()"""
         self.icons = {}
+        self._begin_load()
+        
+        with self.lock:
+            self.generation += 1
+            self.pending = {}
+            self.source_names = {}
+            self.name_sources = {}
+            self.source_surfaces = {}
+            
+            for request in self._collect_requests(categories_data, subcategories_data, options_data):
+                self._register(*request, resources_dir)
+        
+        self._finish_registration()
+        return self.icons, self.option_icon
+    
+    def update_icons(self, categories_data, subcategories_data, options_data, resources_dir):
+        """Обновление набора иконок после изменения данных меню: загружаются только
+        новые имена и имена со сменившимся файлом, исчезнувшие имена удаляются.
+        Возвращает количество зарегистрированных заново имен"""
+        requests = self._collect_requests(categories_data, subcategories_data, options_data)
+        wanted = {request[0] for request in requests}
+        self._begin_load()
+        
+        registered = 0
+        with self.lock:
+            for name in [name for name in self.icons if name not in wanted]:
+                self._unregister(name)
+            
+            for name, icon_name, icon_size, priority in requests:
+                if name in self.icons and self.name_sources.get(name) == self._get_source(icon_name, icon_size, resources_dir):
+                    continue
+                self._unregister(name)
+                self._register(name, icon_name, icon_size, priority, resources_dir)
+                registered += 1
+        
+        self._finish_registration()
+        return registered
+    
+    def add_icons(self, options_data, resources_dir):
+        """Регистрация иконок опций, которые подгружаются страницами (хранилище SQLite):
+        уже известные имена пропускаются, новые грузятся в первую очередь - они на экране"""
+        if not self.is_loading():
+            self._begin_load()
+        
+        with self.lock:
+            for name, icon_name, icon_size, priority in self._collect_requests([], {}, options_data):
+                if name not in self.icons:
+                    self._register(name, icon_name, icon_size, PRIORITY_VISIBLE, resources_dir)
+        
+        if self.pending:
+            self._start_workers()
+    
+    def remove_icons(self, names):
+        """Удаление иконок выгруженных опций"""
+        with self.lock:
+            for name in names:
+                self._unregister(name)
+    
+    def _begin_load(self):
+        """Начало замера загрузки набора иконок"""
+        self.load_start = time.perf_counter()
+        self.load_time = None
+        if self.disk_cache is not None:
+            self.disk_cache.reset_stats()
+    
+    def _finish_registration(self):
+        """Запуск потоков для новых заданий или отчет, если все готово сразу"""
+        if self.pending:
+            print(f"Registered {len(self.icons)} icons, {len(self.pending)} files loading in background")
+            self._start_workers()
+        else:
+            self._report_loaded()
+    
+    @staticmethod
+    def _collect_requests(categories_data, subcategories_data, options_data):
+        """Список (имя, файл иконки, размер, приоритет) для всех пунктов меню"""
+        requests = []
         
-        # Загрузка иконок категорий
+        # Иконки категорий
         for category in categories_data:
-            icon_name = category.get("icon")
-            display_name = category["name"]
-            if icon_name:
-                filepath = os.path.join(resources_dir, "icons", icon_name)
-                self.icons[display_name] = self._load_single_icon(filepath, display_name, CATEGORY_ICON_SIZE)
-            else:
-                # Создаем заглушку если иконка не указана
-                self.icons[display_name] = self._create_placeholder_icon(display_name, CATEGORY_ICON_SIZE)
+            requests.append((category["name"], category.get("icon"), CATEGORY_ICON_SIZE, PRIORITY_CATEGORY))
         
-        # Загрузка иконок подкатегорий
+        # Иконки подкатегорий
         for sub_name, sub_data in subcategories_data.items():
-            icon_name = sub_data.get("icon")
-            if icon_name:
-                filepath = os.path.join(resources_dir, "icons", icon_name)
-                self.icons[sub_name] = self._load_single_icon(filepath, sub_name, SUBCATEGORY_ICON_SIZE)
-            else:
-                # Создаем заглушку если иконка не указана
-                self.icons[sub_name] = self._create_placeholder_icon(sub_name, SUBCATEGORY_ICON_SIZE)
+            requests.append((sub_name, sub_data.get("icon"), SUBCATEGORY_ICON_SIZE, PRIORITY_SUBCATEGORY))
         
-        # Загрузка иконок опций
+        # Иконки опций
         for opt_name, opt_data in options_data.items():
-            icon_name = opt_data.get("icon")
-            if icon_name:
-                filepath = os.path.join(resources_dir, "icons", icon_name)
-                self.icons[opt_name] = self._load_single_icon(filepath, opt_name, OPTION_ICON_SIZE)
-            else:
-                # Создаем заглушку если иконка не указана
-                self.icons[opt_name] = self._create_placeholder_icon(opt_name, OPTION_ICON_SIZE)
+            requests.append((opt_name, opt_data.get("icon"), OPTION_ICON_SIZE, PRIORITY_OPTION))
+        return requests
+    
+    @staticmethod
+    def _get_source(icon_name, icon_size, resources_dir):
+        """Источник иконки - (нормализованный путь, размер); None если иконка не указана"""
+        if not icon_name:
+            return None
+        return (os.path.normcase(os.path.abspath(os.path.join(resources_dir, "icons", icon_name))), icon_size)
+    
+    def _register(self, name, icon_name, icon_size, priority, resources_dir):
+        """Регистрация иконки одного имени (под self.lock)"""
+        source = self._get_source(icon_name, icon_size, resources_dir)
+        if source is None:
+            # Создаем заглушку если иконка не указана
+            self.icons[name] = self._create_placeholder_icon(name, icon_size)
+            return
         
-        print(f"Loaded {len(self.icons)} icons")
-        return self.icons, self.option_icon
+        self.name_sources[name] = source
+        names = self.source_names.setdefault(source, [])
+        names.append(name)
+        
+        if source in self.source_surfaces:
+            # Источник уже загружен - иконка готова сразу
+            self.icons[name] = self._get_source_icon(name, source)
+        elif len(names) > 1:
+            # Источник уже в очереди - иконка придет вместе с ним
+            self.icons[name] = self._get_placeholder_base(icon_size)
+            if source in self.pending and priority < self.pending[source]:
+                self.pending[source] = priority
+                self.jobs.put((priority, next(self.order), self.generation, source))
+        elif self.threads <= 0:
+            surface = self._load_single_icon(source[0], name, icon_size)
+            self.source_surfaces[source] = surface.convert_alpha() if surface is not None else None
+            self.icons[name] = self._get_source_icon(name, source)
+        else:
+            self.icons[name] = self._get_placeholder_base(icon_size)
+            self.pending[source] = priority
+            self.jobs.put((priority, next(self.order), self.generation, source))
+    
+    def _unregister(self, name):
+        """Удаление имени из набора; источник без имен забывается (под self.lock)"""
+        self.icons.pop(name, None)
+        source = self.name_sources.pop(name, None)
+        if source is None:
+            return
+        
+        names = self.source_names.get(source)
+        if names is not None and name in names:
+            names.remove(name)
+        if not names:
+            self.source_names.pop(source, None)
+            self.source_surfaces.pop(source, None)
+            self.pending.pop(source, None)
+    
+    def _start_workers(self):
+        """Запуск потоков загрузки (один раз)"""
+        while len(self.workers) < self.threads:
+            worker = threading.Thread(target=self._worker_loop, name=f"IconLoader-{len(self.workers)}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+    
+    def _worker_loop(self):
+        """Поток загрузки: берет самое приоритетное задание и готовит иконку без привязки к экрану"""
+        while True:
+            priority, order, generation, source = self.jobs.get()
+            if source is None:
+                break
+            
+            with self.lock:
+                # Задание устарело или иконку уже взял другой поток (после повышения приоритета)
+                if generation != self.generation or source not in self.pending:
+                    continue
+                del self.pending[source]
+                name = self.source_names[source][0]
+                self.in_flight += 1
+            
+            filepath, icon_size = source
+            surface = self._load_single_icon(filepath, name, icon_size)
+            self.results.put((generation, source, surface))
+            
+            with self.lock:
+                self.in_flight -= 1
+    
+    def poll(self, max_icons=ICON_LOADER_SWAPS_PER_FRAME):
+        """Главный поток: подстановка готовых иконок; возвращает их количество.
+        Старая поверхность заменяется новой, поэтому кэш прозрачности и
+        отслеживание грязных областей видят смену сами"""
+        swapped = 0
+        while swapped < max_icons:
+            try:
+                generation, source, surface = self.results.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Набор сменился или все имена источника удалены, пока он грузился
+            if generation != self.generation or source not in self.source_names:
+                continue
+            self.source_surfaces[source] = surface.convert_alpha() if surface is not None else None
+            for name in self.source_names[source]:
+                self.icons[name] = self._get_source_icon(name, source)
+            swapped += 1
+        
+        if swapped and not self.is_loading():
+            self._report_loaded()
+        return swapped
+    
+    def _get_source_icon(self, name, source):
+        """Готовая поверхность источника (общая для всех его имен) или буквенная
+        заглушка имени, если файл не загрузился"""
+        surface = self.source_surfaces[source]
+        if surface is None:
+            return self._create_placeholder_icon(name, source[1])
+        return surface
+    
+    def _report_loaded(self):
+        """Сообщение о завершении загрузки: память иконок и эффективность дискового кэша"""
+        self.load_time = (time.perf_counter() - self.load_start) * 1000
+        memory = self.get_memory_stats()
+        message = (f"Loaded {memory['icons']} icons in {self.load_time:.0f} ms: {memory['surfaces']} surfaces, "
+                   f"{memory['bytes'] / 1024:.0f} KB ({memory['unshared_bytes'] / 1024:.0f} KB without sharing)")
+        if self.disk_cache is not None:
+            stats = self.disk_cache.get_stats()
+            message += f", disk cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})"
+        print(message)
+    
+    def get_memory_stats(self):
+        """Память пикселей иконок: фактическая и при отдельной поверхности на каждое имя"""
+        unique = {id(surface): surface for surface in self.icons.values()}
+        return {
+            "icons": len(self.icons),
+            "surfaces": len(unique),
+            "bytes": sum(self._surface_bytes(surface) for surface in unique.values()),
+            "unshared_bytes": sum(self._surface_bytes(surface) for surface in self.icons.values()),
+        }
+    
+    @staticmethod
+    def _surface_bytes(surface):
+        """Размер пикселей поверхности в байтах"""
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+    
+    def is_loading(self):
+        """Остались незагруженные или еще не подставленные иконки"""
+        return bool(self.pending) or self.in_flight > 0 or not self.results.empty()
+    
+    def prioritize(self, name, priority=PRIORITY_VISIBLE):
+        """Поднять иконку в очереди загрузки (она видна на экране или выбрана)"""
+        source = self.name_sources.get(name)
+        if source not in self.pending:
+            return
+        
+        with self.lock:
+            pending_priority = self.pending.get(source)
+            if pending_priority is None or pending_priority <= priority:
+                return
+            
+            # Старое задание останется в очереди и будет пропущено потоком
+            self.pending[source] = priority
+            self.jobs.put((priority, next(self.order), self.generation, source))
+    
+    def stop(self):
+        """Остановка потоков загрузки"""
+        with self.lock:
+            self.generation += 1
+            self.pending = {}
+        # Задание без имени с наивысшим приоритетом завершает поток
+        for worker in self.workers:
+            self.jobs.put((-1, next(self.order), None, None))
+        self.workers = []
     
     def _load_single_icon(self, filepath, name, icon_size):
-        """Загрузка одной иконки с указанным размером"""
+        """Загрузка одной иконки с указанным размером. Не обращается к дисплею и
+        вызывается из потоков загрузки; None - файла нет или он не читается"""
         try:
             if os.path.exists(filepath):
+                # Готовая иконка из дискового кэша - без декодирования и масштабирования
+                if self.disk_cache is not None:
+                    cached = self.disk_cache.load(filepath, icon_size)
+                    if cached is not None:
+                        return cached
+                
                 # Загружаем изображение
-                icon = pygame.image.load(filepath).convert_alpha()
+                icon = pygame.image.load(filepath)
+                
+                # smoothscale работает только с 24/32-битными поверхностями (палитровые PNG)
+                if icon.get_bitsize() < 24:
+                    converted = pygame.Surface(icon.get_size(), pygame.SRCALPHA, 32)
+                    converted.blit(icon, (0, 0))
+                    icon = converted
                 
                 # Получаем размеры оригинальной иконки
                 original_width, original_height = icon.get_size()
@@ -66,7 +351,7 @@ class IconManager:
                 icon = pygame.transform.smoothscale(icon, (new_width, new_height))
                 
                 # Создаем поверхность нужного размера с прозрачностью
-                final_surface = pygame.Surface(icon_size, pygame.SRCALPHA)
+                final_surface = pygame.Surface(icon_size, pygame.SRCALPHA, 32)
                 
                 # Вычисляем позицию для центрирования иконки
                 x_pos = (icon_size[0] - new_width) // 2
@@ -75,45 +360,60 @@ class IconManager:
                 # Помещаем иконку в центр
                 final_surface.blit(icon, (x_pos, y_pos))
                 
-                print(f"Loaded icon: {os.path.basename(filepath)} for '{name}' ({original_width}x{original_height} -> {new_width}x{new_height})")
+                if self.disk_cache is not None:
+                    self.disk_cache.save(filepath, icon_size, final_surface)
                 return final_surface
             else:
                 print(f"Warning: Icon not found: {os.path.basename(filepath)} for '{name}'")
-                return self._create_placeholder_icon(name, icon_size)
+                return None
         except Exception as e:
             print(f"Error loading icon {filepath} for '{name}': {e}")
-            return self._create_placeholder_icon(name, icon_size)
+            return None
+    
+    def _get_placeholder_base(self, icon_size):
+        """Серебристый фон заглушки с рамкой - строится один раз на размер.
+        Поверхность общая - изменять ее нельзя"""
+        base = self.placeholder_bases.get(icon_size)
+        if base is None:
+            base = pygame.Surface(icon_size, pygame.SRCALPHA)
+            
+            # Серебристый градиент
+            for i in range(icon_size[0]):
+                for j in range(icon_size[1]):
+                    brightness = 200 - (i + j) * 100 // (icon_size[0] + icon_size[1])
+                    color = (brightness, brightness, brightness, 255)
+                    base.set_at((i, j), color)
+            
+            # Темная рамка
+            pygame.draw.rect(base, (100, 100, 100), (0, 0, icon_size[0], icon_size[1]), 2, border_radius=8)
+            self.placeholder_bases[icon_size] = base
+        return base
     
     def _create_placeholder_icon(self, name, icon_size):
         """Создание заглушки для иконки с указанным размером"""
-        surf = pygame.Surface(icon_size, pygame.SRCALPHA)
-        
-        # Серебристый градиент
-        for i in range(icon_size[0]):
-            for j in range(icon_size[1]):
-                brightness = 200 - (i + j) * 100 // (icon_size[0] + icon_size[1])
-                color = (brightness, brightness, brightness, 255)
-                surf.set_at((i, j), color)
-        
-        # Темная рамка
-        pygame.draw.rect(surf, (100, 100, 100), (0, 0, icon_size[0], icon_size[1]), 2, border_radius=8)
+        surf = self._get_placeholder_base(icon_size).copy()
         
         # Текст с первой буквой имени
         if name:
             text_char = name[0].upper()
         else:
             text_char = "?"
-            
+        
         font_size = min(icon_size[0] // 2, 24)
-        font = pygame.font.SysFont('Arial', font_size, bold=True)
+        font = self.placeholder_fonts.get(font_size)
+        if font is None:
+            font = pygame.font.SysFont('Arial', font_size, bold=True)
+            self.placeholder_fonts[font_size] = font
         text = font.render(text_char, True, WHITE)
         text_rect = text.get_rect(center=(icon_size[0]//2, icon_size[1]//2))
         surf.blit(text, text_rect)
         
         return surf
     
-    def get_icon(self, name):
-        """Получение иконки по имени"""
+    def get_icon(self, name, priority=PRIORITY_VISIBLE):
+        """Получение иконки по имени; незагруженная иконка поднимается в очереди"""
+        if self.pending:
+            self.prioritize(name, priority)
         return self.icons.get(name)
     
     def get_option_icon(self):
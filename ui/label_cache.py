@@ -0,0 +1,81 @@
+# ui/label_cache.py
+from collections import OrderedDict
+from config import *
+
+class LabelCache:
+    def __init__(self, sprite_cache, max_entries=LABEL_CACHE_MAX_ENTRIES, max_bytes=LABEL_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        # Ключ (шрифт, текст, цвет) -> непрозрачная надпись. Варианты с прозрачностью
+        # берутся из SpriteAlphaCache по квантованным уровням: плавное затухание
+        # надписи не растеризует ее заново на каждом кадре
+        self.sprite_cache = sprite_cache
+        self.entries = OrderedDict()
+        self.variant_bytes = {}
+        self.memory_used = 0
+        
+        # Статистика
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def render(self, font, text, color, alpha=255):
+        """Получение поверхности надписи; растеризация только при промахе кэша.
+        Возвращаемая поверхность общая - изменять ее нельзя"""
+        key = (font, text, tuple(color))
+        
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            surface = font.render(text, True, color)
+            self.entries[key] = surface
+            self.variant_bytes[key] = 0
+            self.memory_used += self._surface_bytes(surface)
+        
+        if alpha < 255:
+            copies = self.sprite_cache.copies
+            surface = self.sprite_cache.get(("label",) + key, surface, alpha)
+            if self.sprite_cache.copies != copies:
+                # Новый вариант прозрачности учитывается в памяти надписи
+                size = self._surface_bytes(surface)
+                self.variant_bytes[key] += size
+                self.memory_used += size
+        
+        self._evict()
+        return surface
+    
+    def _evict(self):
+        """Удаление давно не использованных надписей сверх лимитов"""
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.memory_used > self.max_bytes):
+            key, surface = self.entries.popitem(last=False)
+            self.memory_used -= self._surface_bytes(surface) + self.variant_bytes.pop(key)
+            self.sprite_cache.invalidate(("label",) + key)
+            self.evictions += 1
+    
+    def _surface_bytes(self, surface):
+        """Объем памяти поверхности"""
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+    
+    def clear(self):
+        """Очистка кэша (например, после смены шрифтов)"""
+        self.entries.clear()
+        self.variant_bytes.clear()
+        self.sprite_cache.invalidate_group("label")
+        self.memory_used = 0
+    
+    def get_stats(self):
+        """Статистика попаданий и использования памяти"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "memory_bytes": self.memory_used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
\ No newline at end of file
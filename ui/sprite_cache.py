@@ -0,0 +1,67 @@
+# ui/sprite_cache.py
+from config import *
+
+class SpriteAlphaCache:
+    def __init__(self, steps=SPRITE_ALPHA_STEPS):
+        # Шаг квантования прозрачности (32 уровня -> шаг 8)
+        self.step = max(1, 256 // steps)
+        
+        # Ключ -> исходная поверхность и ее готовые варианты по уровням прозрачности
+        self.sources = {}
+        self.variants = {}
+        
+        # Сколько копий поверхностей было создано
+        self.copies = 0
+    
+    def quantize(self, alpha):
+        """Округление прозрачности до ближайшего уровня кэша"""
+        alpha = max(0, min(255, int(alpha)))
+        return min(255, (alpha + self.step // 2) // self.step * self.step)
+    
+    def get(self, key, surface, alpha):
+        """Получение варианта поверхности с нужной прозрачностью без копирования.
+        Возвращаемая поверхность общая - изменять ее нельзя"""
+        # Иконка была перезагружена - старые варианты больше не годятся
+        if self.sources.get(key) is not surface:
+            self.sources[key] = surface
+            self.variants[key] = {}
+        
+        level = self.quantize(alpha)
+        if level >= 255:
+            return surface
+        
+        variants = self.variants[key]
+        variant = variants.get(level)
+        if variant is None:
+            variant = surface.copy()
+            variant.set_alpha(level)
+            variants[level] = variant
+            self.copies += 1
+        return variant
+    
+    def prebuild(self, key, surface):
+        """Заранее строит все уровни прозрачности (для небольших поверхностей свечения)"""
+        for level in range(0, 255, self.step):
+            self.get(key, surface, level)
+    
+    def invalidate(self, key=None):
+        """Сброс вариантов одной поверхности или всего кэша"""
+        if key is None:
+            self.sources.clear()
+            self.variants.clear()
+        else:
+            self.sources.pop(key, None)
+            self.variants.pop(key, None)
+    
+    def invalidate_group(self, group):
+        """Сброс вариантов всех поверхностей группы (первый элемент ключа, например "icon")"""
+        for key in [key for key in self.sources if key[0] == group]:
+            self.invalidate(key)
+    
+    def get_stats(self):
+        """Статистика кэша"""
+        return {
+            "sprites": len(self.sources),
+            "variants": sum(len(variants) for variants in self.variants.values()),
+            "copies": self.copies,
+        }
\ No newline at end of file